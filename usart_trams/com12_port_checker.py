@@ -10,6 +10,50 @@ import time
 import sys
 import subprocess
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+# 串口枚举缓存 - Windows 下 comports() 需遍历设备树，耗时 100-500ms
+_PORTS_CACHE = {'ts': 0.0, 'val': None}
+
+
+def _cached_comports(ttl=3.0):
+    """带短时缓存的串口枚举"""
+    now = time.monotonic()
+    if _PORTS_CACHE['val'] is None or now - _PORTS_CACHE['ts'] >= ttl:
+        _PORTS_CACHE['val'] = serial.tools.list_ports.comports()
+        _PORTS_CACHE['ts'] = now
+    return _PORTS_CACHE['val']
+
+
+# GetCommProperties 返回的 dwSettableBaud 位 (winbase.h)
+_WIN_BAUD_FLAGS = {
+    9600: 0x00000800,
+    19200: 0x00002000,
+    38400: 0x00004000,
+    57600: 0x00040000,
+    115200: 0x00020000,
+    128000: 0x00010000,
+}
+_WIN_BAUD_USER = 0x10000000  # 驱动支持任意可编程波特率
+
+# 静态横幅在导入时编码一次，输出时直接写字节
+_BANNER_FULL_CHECK = """
+🔧 COM12端口诊断工具
+===================
+
+目标: 解决COM12端口访问问题
+
+检查项目:
+1. 扫描所有串口
+2. 检查COM12访问权限
+3. 查找占用进程
+4. 测试不同波特率
+5. 提供解决建议
+
+开始检查...
+
+""".encode('utf-8')
+
 
 class COM12PortChecker:
     """COM12端口检查器"""
@@ -21,36 +65,79 @@ class COM12PortChecker:
         """列出所有可用端口"""
         print("🔍 扫描所有串口...")
         
-        ports = serial.tools.list_ports.comports()
+        ports = _cached_comports()
         
         if not ports:
             print("❌ 未发现任何串口")
             return []
         
-        print(f"✅ 发现 {len(ports)} 个串口:")
+        # 先拼装完整报告，再一次性写出
+        buf = [f"✅ 发现 {len(ports)} 个串口:"]
         
         available_ports = []
         for port in ports:
-            print(f"   {port.device}: {port.description}")
+            buf.append(f"   {port.device}: {port.description}")
             if port.hwid:
-                print(f"      硬件ID: {port.hwid}")
+                buf.append(f"      硬件ID: {port.hwid}")
             if port.manufacturer:
-                print(f"      制造商: {port.manufacturer}")
+                buf.append(f"      制造商: {port.manufacturer}")
             
             available_ports.append(port.device)
         
+        sys.stdout.write('\n'.join(buf) + '\n')
+        sys.stdout.flush()
+        
         return available_ports
+
+    def _probe_port(self, port_name, baudrate):
+        """静默探测端口能否打开，返回 (端口, 是否成功, 错误类型)"""
+        try:
+            # 打开前关闭 DTR/RTS，探测时不拉动控制线 (避免复位串口另一端的设备)
+            ser = serial.Serial()
+            ser.port = port_name
+            ser.baudrate = baudrate
+            ser.timeout = 0
+            ser.dtr = False
+            ser.rts = False
+            ser.open()
+            ser.close()
+            return port_name, True, None
+        except Exception as e:
+            return port_name, False, type(e).__name__
+
+    def probe_ports_concurrently(self, ports, baudrate=128000):
+        """并发探测多个不同端口的访问状态"""
+        if not ports:
+            return {}
+
+        print(f"\n🔐 并发探测 {len(ports)} 个串口访问状态...")
+
+        # 不同端口之间互不影响，可以同时打开；同一端口仍需串行
+        with ThreadPoolExecutor(max_workers=len(ports)) as executor:
+            results = list(executor.map(lambda p: self._probe_port(p, baudrate), ports))
+
+        access = {}
+        for port_name, ok, error in results:
+            access[port_name] = ok
+            if ok:
+                print(f"   ✅ {port_name}: 可访问")
+            else:
+                print(f"   ❌ {port_name}: {error}")
+
+        return access
     
     def check_port_access(self, port_name, baudrate=128000):
         """检查端口访问权限"""
         print(f"\n🔐 检查 {port_name} 访问权限...")
         
         try:
-            # 尝试打开端口
+            # 尝试打开端口 - 非阻塞+独占，端口异常时立即失败而不是等待超时
             ser = serial.Serial(
                 port=port_name,
                 baudrate=baudrate,
-                timeout=1.0
+                timeout=0,
+                write_timeout=0,
+                exclusive=True
             )
             
             print(f"✅ {port_name} 访问成功")
@@ -91,12 +178,39 @@ class COM12PortChecker:
         print(f"\n🔍 查找占用 {port_name} 的进程...")
         
         try:
-            # 使用wmic查找占用串口的进程
-            cmd = f'wmic process where "CommandLine like \'%{port_name}%\'" get ProcessId,Name,CommandLine /format:csv'
+            import psutil
+        except ImportError:
+            # 未安装psutil时退回wmic查询
+            self._find_processes_with_wmic(port_name)
+            return
+        
+        try:
+            # 进程内遍历，无需启动wmic子进程
+            needle = port_name.casefold()
+            processes_found = False
+            
+            for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
+                cmdline = ' '.join(proc.info['cmdline'] or ())
+                if needle in cmdline.casefold():
+                    processes_found = True
+                    print(f"   进程: {proc.info['name']} (PID: {proc.info['pid']})")
+                    print(f"   命令行: {cmdline}")
             
+            if not processes_found:
+                print(f"   未发现明确占用 {port_name} 的进程")
+                
+        except Exception as e:
+            print(f"   查询进程失败: {e}")
+    
+    def _find_processes_with_wmic(self, port_name):
+        """使用wmic查找占用端口的进程（psutil不可用时的后备方案）"""
+        try:
+            # 参数列表形式调用，不经过cmd.exe
             result = subprocess.run(
-                cmd,
-                shell=True,
+                [
+                    'wmic', 'process', 'where', f"CommandLine like '%{port_name}%'",
+                    'get', 'ProcessId,Name,CommandLine', '/format:csv'
+                ],
                 capture_output=True,
                 text=True,
                 timeout=10
@@ -105,9 +219,10 @@ class COM12PortChecker:
             if result.returncode == 0 and result.stdout:
                 lines = result.stdout.strip().split('\n')
                 processes_found = False
+                needle = port_name.casefold()
                 
                 for line in lines[1:]:  # 跳过标题行
-                    if line.strip() and port_name.lower() in line.lower():
+                    if line and needle in line.casefold():
                         processes_found = True
                         parts = line.split(',')
                         if len(parts) >= 3:
@@ -129,77 +244,152 @@ class COM12PortChecker:
         baudrates = [9600, 19200, 38400, 57600, 115200, 128000, 230400, 460800, 921600]
         
         working_baudrates = []
+        ser = None
+        settable_baud = None
         
-        for baudrate in baudrates:
-            try:
-                ser = serial.Serial(
-                    port=port_name,
-                    baudrate=baudrate,
-                    timeout=0.5
-                )
-                
-                print(f"   ✅ {baudrate}: 成功")
-                working_baudrates.append(baudrate)
-                
-                # 快速检查是否有数据
-                time.sleep(0.1)
-                if ser.in_waiting > 0:
-                    data = ser.read(ser.in_waiting)
-                    print(f"      检测到数据: {len(data)} 字节")
+        try:
+            for baudrate in baudrates:
+                # 驱动已声明不支持的波特率无需实际探测
+                if not self._baud_supported(baudrate, settable_baud):
+                    print(f"   ⏭️ {baudrate}: 驱动不支持，跳过")
+                    continue
                 
+                try:
+                    # 只打开一次端口，之后仅重新配置波特率
+                    if ser is None:
+                        ser = serial.Serial(
+                            port=port_name,
+                            baudrate=baudrate,
+                            timeout=0
+                        )
+                        settable_baud = self._get_settable_baud(ser)
+                    else:
+                        ser.baudrate = baudrate
+                        ser.reset_input_buffer()
+                    
+                    print(f"   ✅ {baudrate}: 成功")
+                    working_baudrates.append(baudrate)
+                    
+                    # 快速检查是否有数据 - 最多等待约256字节的传输时间 (每字节10位)
+                    # read(1) 在驱动内阻塞，首字节到达即返回，无需固定休眠
+                    ser.timeout = max(0.02, min(0.1, 2560 / baudrate))
+                    data = ser.read(1)
+                    if data:
+                        data += self._drain_input(ser)
+                        print(f"      检测到数据: {len(data)} 字节")
+                    
+                except Exception as e:
+                    print(f"   ❌ {baudrate}: {type(e).__name__}")
+        finally:
+            if ser is not None:
                 ser.close()
-                
-            except Exception as e:
-                print(f"   ❌ {baudrate}: {type(e).__name__}")
         
         return working_baudrates
+
+    def _get_settable_baud(self, ser):
+        """读取驱动报告的可设置波特率位掩码，非Windows或失败时返回None"""
+        if sys.platform != 'win32':
+            return None
+        
+        try:
+            import ctypes
+            from ctypes import wintypes
+            
+            class COMMPROP(ctypes.Structure):
+                _fields_ = [
+                    ('wPacketLength', wintypes.WORD),
+                    ('wPacketVersion', wintypes.WORD),
+                    ('dwServiceMask', wintypes.DWORD),
+                    ('dwReserved1', wintypes.DWORD),
+                    ('dwMaxTxQueue', wintypes.DWORD),
+                    ('dwMaxRxQueue', wintypes.DWORD),
+                    ('dwMaxBaud', wintypes.DWORD),
+                    ('dwProvSubType', wintypes.DWORD),
+                    ('dwProvCapabilities', wintypes.DWORD),
+                    ('dwSettableParams', wintypes.DWORD),
+                    ('dwSettableBaud', wintypes.DWORD),
+                    ('wSettableData', wintypes.WORD),
+                    ('wSettableStopParity', wintypes.WORD),
+                    ('dwCurrentTxQueue', wintypes.DWORD),
+                    ('dwCurrentRxQueue', wintypes.DWORD),
+                    ('dwProvSpec1', wintypes.DWORD),
+                    ('dwProvSpec2', wintypes.DWORD),
+                    ('wcProvChar', wintypes.WCHAR * 1),
+                ]
+            
+            props = COMMPROP()
+            if not ctypes.windll.kernel32.GetCommProperties(ser._port_handle, ctypes.byref(props)):
+                return None
+            return props.dwSettableBaud
+            
+        except Exception:
+            return None
     
+    @staticmethod
+    def _baud_supported(baudrate, settable_baud):
+        """根据驱动位掩码判断波特率是否可设置"""
+        if settable_baud is None or settable_baud & _WIN_BAUD_USER:
+            return True
+        flag = _WIN_BAUD_FLAGS.get(baudrate)
+        return flag is not None and bool(settable_baud & flag)
+
+    def _drain_input(self, ser, max_bytes=65536):
+        """一次性读空输入缓冲区，直到端口空闲或达到上限"""
+        chunks = []
+        total = 0
+
+        while total < max_bytes:
+            n = ser.in_waiting
+            if not n:
+                break
+            chunk = ser.read(min(n, max_bytes - total))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            total += len(chunk)
+            time.sleep(0.005)  # 给驱动时间填充下一批数据
+
+        return b''.join(chunks)
+
     def suggest_solutions(self):
         """建议解决方案"""
-        print(f"\n💡 解决 COM12 访问问题的建议:")
-        print(f"="*50)
-        
-        print(f"1. 🔒 检查端口占用:")
-        print(f"   - 关闭可能使用COM12的程序")
-        print(f"   - 检查设备管理器中的串口状态")
-        print(f"   - 重启相关设备")
-        
-        print(f"\n2. 👑 管理员权限:")
-        print(f"   - 以管理员身份运行PowerShell")
-        print(f"   - 右键点击PowerShell -> 以管理员身份运行")
-        
-        print(f"\n3. 🔧 设备管理器检查:")
-        print(f"   - Win+X -> 设备管理器")
-        print(f"   - 展开 '端口(COM和LPT)'")
-        print(f"   - 查看COM12状态")
-        print(f"   - 如有黄色感叹号，右键更新驱动")
-        
-        print(f"\n4. 🔄 重置端口:")
-        print(f"   - 设备管理器中禁用COM12")
-        print(f"   - 等待5秒后重新启用")
+        buf = [
+            f"\n💡 解决 COM12 访问问题的建议:",
+            f"="*50,
+            
+            f"1. 🔒 检查端口占用:",
+            f"   - 关闭可能使用COM12的程序",
+            f"   - 检查设备管理器中的串口状态",
+            f"   - 重启相关设备",
+            
+            f"\n2. 👑 管理员权限:",
+            f"   - 以管理员身份运行PowerShell",
+            f"   - 右键点击PowerShell -> 以管理员身份运行",
+            
+            f"\n3. 🔧 设备管理器检查:",
+            f"   - Win+X -> 设备管理器",
+            f"   - 展开 '端口(COM和LPT)'",
+            f"   - 查看COM12状态",
+            f"   - 如有黄色感叹号，右键更新驱动",
+            
+            f"\n4. 🔄 重置端口:",
+            f"   - 设备管理器中禁用COM12",
+            f"   - 等待5秒后重新启用",
+            
+            f"\n5. 🔌 硬件检查:",
+            f"   - 重新插拔USB连接",
+            f"   - 检查设备电源",
+            f"   - 尝试不同的USB端口",
+        ]
         
-        print(f"\n5. 🔌 硬件检查:")
-        print(f"   - 重新插拔USB连接")
-        print(f"   - 检查设备电源")
-        print(f"   - 尝试不同的USB端口")
+        sys.stdout.write('\n'.join(buf) + '\n')
+        sys.stdout.flush()
     
     def run_full_check(self):
         """运行完整检查"""
-        print(f"""
-🔧 COM12端口诊断工具
-===================
-
-目标: 解决COM12端口访问问题
-
-检查项目:
-1. 扫描所有串口
-2. 检查COM12访问权限
-3. 查找占用进程
-4. 测试不同波特率
-5. 提供解决建议
-
-开始检查...
-""")
+        sys.stdout.flush()  # 先输出文本层中已缓冲的内容
+        sys.stdout.buffer.write(_BANNER_FULL_CHECK)
+        sys.stdout.buffer.flush()
         
         # 步骤1: 扫描所有端口
         print("\n" + "="*50)
@@ -207,6 +397,8 @@ class COM12PortChecker:
         print("="*50)
         
         available_ports = self.list_all_ports()
+        # 目标端口在步骤2中单独检查，这里只探测其他端口，避免重复打开
+        self.probe_ports_concurrently([p for p in available_ports if p != self.target_port])
         
         if self.target_port not in available_ports:
             print(f"\n❌ {self.target_port} 不在可用端口列表中")
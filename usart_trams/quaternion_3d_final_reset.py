@@ -8,17 +8,14 @@ import asyncio
 import logging
 import sys
 import time
-import math
 import numpy as np
-from pathlib import Path
 import threading
 
-# 添加src目录到路径
-sys.path.insert(0, str(Path(__file__).parent / 'src'))
-
 from src.config import Config
 from src.serial_manager import SerialManager
 from src.quaternion_processor import QuaternionProcessor
+from src.quat_kernels import (qmul, qconj, qnormalize, q_to_matrix, q_same_rotation, rotate_vectors,
+                              warmup as warmup_quat_kernels)
 
 # 配置日志
 logging.basicConfig(level=logging.WARNING)
@@ -32,50 +29,27 @@ except ImportError:
 
 
 class QuaternionMath:
-    """四元数数学运算"""
+    """四元数数学运算 (四元数为 [w, x, y, z] 的 float64 数组，out 参数可复用预分配缓冲区)"""
     
     @staticmethod
-    def normalize(q):
+    def normalize(q, out=None):
         """四元数归一化"""
-        norm = math.sqrt(q['w']**2 + q['x']**2 + q['y']**2 + q['z']**2)
-        if norm > 0:
-            return {'w': q['w']/norm, 'x': q['x']/norm, 'y': q['y']/norm, 'z': q['z']/norm}
-        return q
+        return qnormalize(q, np.empty(4) if out is None else out)
     
     @staticmethod
-    def conjugate(q):
+    def conjugate(q, out=None):
         """四元数共轭（逆）"""
-        return {'w': q['w'], 'x': -q['x'], 'y': -q['y'], 'z': -q['z']}
+        return qconj(q, np.empty(4) if out is None else out)
     
     @staticmethod
-    def multiply(q1, q2):
+    def multiply(q1, q2, out=None):
         """四元数乘法"""
-        w = q1['w']*q2['w'] - q1['x']*q2['x'] - q1['y']*q2['y'] - q1['z']*q2['z']
-        x = q1['w']*q2['x'] + q1['x']*q2['w'] + q1['y']*q2['z'] - q1['z']*q2['y']
-        y = q1['w']*q2['y'] - q1['x']*q2['z'] + q1['y']*q2['w'] + q1['z']*q2['x']
-        z = q1['w']*q2['z'] + q1['x']*q2['y'] - q1['y']*q2['x'] + q1['z']*q2['w']
-        return {'w': w, 'x': x, 'y': y, 'z': z}
-    
-    @staticmethod
-    def remove_offset(q_current, q_offset):
-        """从当前四元数中移除偏移量
-        公式：q_result = q_offset^(-1) * q_current
-        这样当q_current = q_offset时，结果为单位四元数(1,0,0,0)
-        """
-        q_offset_inv = QuaternionMath.conjugate(q_offset)
-        return QuaternionMath.multiply(q_offset_inv, q_current)
+        return qmul(q1, q2, np.empty(4) if out is None else out)
     
     @staticmethod
-    def to_rotation_matrix(q):
-        """四元数转旋转矩阵"""
-        q = QuaternionMath.normalize(q)
-        w, x, y, z = q['w'], q['x'], q['y'], q['z']
-        
-        return np.array([
-            [1-2*(y*y+z*z), 2*(x*y-w*z), 2*(x*z+w*y)],
-            [2*(x*y+w*z), 1-2*(x*x+z*z), 2*(y*z-w*x)],
-            [2*(x*z-w*y), 2*(y*z+w*x), 1-2*(x*x+y*y)]
-        ])
+    def to_rotation_matrix(q, out=None):
+        """四元数转旋转矩阵，直接写入 3x3 的 out"""
+        return q_to_matrix(q, np.empty((3, 3)) if out is None else out)
 
 
 class FinalQuaternion3DReset:
@@ -100,58 +74,81 @@ class FinalQuaternion3DReset:
         self.serial_manager = SerialManager(self.config, self._process_data)
         
         # 四元数数据 - 正确的重置逻辑
-        self.sensor_quaternion = {'w': 1.0, 'x': 0.0, 'y': 0.0, 'z': 0.0}  # 传感器原始四元数
-        self.offset_quaternion = {'w': 1.0, 'x': 0.0, 'y': 0.0, 'z': 0.0}  # 偏移量四元数（重置时记录）
-        self.model_quaternion = {'w': 1.0, 'x': 0.0, 'y': 0.0, 'z': 0.0}   # 模型显示四元数（移除偏移量后）
+        # 均为 [w, x, y, z] 预分配数组，原地更新
+        self.sensor_quaternion = np.array([1.0, 0.0, 0.0, 0.0])  # 传感器原始四元数
+        self.offset_quaternion = np.array([1.0, 0.0, 0.0, 0.0])  # 偏移量四元数（重置时记录）
+        # 模型显示四元数（移除偏移量后）- 单写单读双缓冲：
+        # 串口线程写入后台缓冲区再翻转 _pub_idx，渲染线程只读前台缓冲区，无需加锁
+        self._model_bufs = [np.array([1.0, 0.0, 0.0, 0.0]), np.array([1.0, 0.0, 0.0, 0.0])]
+        self._pub_idx = 0
+        self._pub_seq = 0   # 每发布一次加1，渲染线程据此判断是否有新数据
+        self._seen_seq = 0
+        self._offset_inv = np.array([1.0, 0.0, 0.0, 0.0])  # 偏移量的逆，仅在重置时更新
+        self._offset_is_identity = True  # 尚未重置时模型四元数即传感器四元数
+        self._model_snapshot = np.empty(4)  # 渲染线程读取模型四元数的快照缓冲区
+        self._last_rendered = np.zeros(4)    # 上次实际渲染的模型四元数 (全零保证首帧渲染)
+        self.render_epsilon = 1e-10  # 1 - |q·q_last| 低于此值视为静止 (约 2e-5 弧度)
         
-        self.data_lock = threading.Lock()
-        self.data_updated = False
+        self.data_lock = threading.Lock()  # 仅用于重置请求
+        self.render_rate = 60.0  # 渲染频率 (Hz)，与显示刷新率一致
         
         # 重置功能
         self.reset_requested = False
+        self.exit_requested = False
         self.reset_count = 0
         
         # 3D对象
         self.vis = None
         self.sensor_mesh = None
         
-        # 预计算的立方体顶点
-        self.original_vertices = np.array([
-            [-1.0, -0.5, -0.25], [1.0, -0.5, -0.25], [1.0, 0.5, -0.25], [-1.0, 0.5, -0.25],
-            [-1.0, -0.5, 0.25], [1.0, -0.5, 0.25], [1.0, 0.5, 0.25], [-1.0, 0.5, 0.25]
-        ])
+        # 立方体静止姿态顶点 (创建网格后从网格读取，保证与三角形索引顺序一致)
+        self.original_vertices = None
+        self._vert_view = None  # 与 Open3D 顶点缓冲区共享内存的视图
+        self._rest_normals = None
+        self._normal_view = None
+        
+        # 预先编译四元数内核，避免首个串口样本承担编译开销
+        warmup_quat_kernels()
         
         print("✅ 初始化完成")
     
     async def _process_data(self, raw_data: bytes):
         """处理串口数据 - 正确的偏移量逻辑"""
         try:
-            processed_data = self.quaternion_processor.process_raw_data(raw_data)
+            # 只解析最新的一个四元数，较早的样本不会被显示
+            latest = self.quaternion_processor.process_raw_data_latest(raw_data)
             
-            if processed_data:
-                latest_point = processed_data[-1]
+            if latest is not None:
+                # 1. 保存传感器原始四元数
+                self.sensor_quaternion[:] = latest
                 
-                with self.data_lock:
-                    # 1. 保存传感器原始四元数
-                    self.sensor_quaternion = latest_point['quaternion'].copy()
-                    
-                    # 2. 检查是否需要重置
-                    if self.reset_requested:
+                # 2. 检查是否需要重置
+                if self.reset_requested:
+                    with self.data_lock:
                         # 记录当前传感器四元数作为偏移量
-                        self.offset_quaternion = self.sensor_quaternion.copy()
+                        self.offset_quaternion[:] = self.sensor_quaternion
+                        QuaternionMath.conjugate(self.offset_quaternion, self._offset_inv)
+                        self._offset_is_identity = False
                         self.reset_requested = False
                         self.reset_count += 1
-                        
-                        print(f"🔄 重置 #{self.reset_count}: 记录偏移量四元数")
-                        print(f"   偏移量: w={self.offset_quaternion['w']:.3f}, x={self.offset_quaternion['x']:.3f}, y={self.offset_quaternion['y']:.3f}, z={self.offset_quaternion['z']:.3f}")
-                        print(f"   ✅ 偏移量已记录，模型将重置到初始姿态")
-                    
-                    # 3. 计算模型四元数 = 移除偏移量后的四元数
-                    # 公式：model_quat = offset_quat^(-1) * sensor_quat
-                    # 当sensor_quat = offset_quat时，model_quat = (1,0,0,0)
-                    self.model_quaternion = QuaternionMath.remove_offset(self.sensor_quaternion, self.offset_quaternion)
                     
-                    self.data_updated = True
+                    w, x, y, z = self.offset_quaternion
+                    print(f"🔄 重置 #{self.reset_count}: 记录偏移量四元数")
+                    print(f"   偏移量: w={w:.3f}, x={x:.3f}, y={y:.3f}, z={z:.3f}")
+                    print(f"   ✅ 偏移量已记录，模型将重置到初始姿态")
+                
+                # 3. 计算模型四元数 = 移除偏移量后的四元数，写入后台缓冲区
+                # 公式：model_quat = offset_quat^(-1) * sensor_quat
+                # 当sensor_quat = offset_quat时，model_quat = (1,0,0,0)
+                back = self._model_bufs[1 - self._pub_idx]
+                if self._offset_is_identity:
+                    back[:] = self.sensor_quaternion
+                else:
+                    QuaternionMath.multiply(self._offset_inv, self.sensor_quaternion, back)
+                
+                # 4. 翻转索引发布 (单次属性赋值，在GIL下是原子的)
+                self._pub_idx = 1 - self._pub_idx
+                self._pub_seq += 1
         
         except Exception as e:
             logger.error(f"数据处理异常: {e}")
@@ -188,6 +185,14 @@ class FinalQuaternion3DReset:
         self.vis.add_geometry(self.sensor_mesh)
         self.vis.add_geometry(coordinate_frame)
         
+        # 记录静止姿态顶点，并获取网格顶点缓冲区的视图用于原地写入
+        self.original_vertices = np.asarray(self.sensor_mesh.vertices).copy()
+        self._vert_view = np.asarray(self.sensor_mesh.vertices)
+        
+        # 纯旋转下法线与顶点同步旋转，无需逐帧重新计算
+        self._rest_normals = np.asarray(self.sensor_mesh.vertex_normals).copy()
+        self._normal_view = np.asarray(self.sensor_mesh.vertex_normals)
+        
         # 设置渲染选项
         render_option = self.vis.get_render_option()
         render_option.background_color = np.array([0.05, 0.05, 0.05])
@@ -205,41 +210,54 @@ class FinalQuaternion3DReset:
     def _update_model(self):
         """更新模型姿态 - 使用移除偏移量后的四元数"""
         try:
-            # 获取模型四元数（已经移除偏移量的）
-            with self.data_lock:
-                if not self.data_updated:
-                    return
-                model_quat = self.model_quaternion.copy()
-                self.data_updated = False
+            # 获取模型四元数（已经移除偏移量的），无锁读取前台缓冲区
+            seq = self._pub_seq
+            if seq == self._seen_seq:
+                return
+            self._seen_seq = seq
+            self._model_snapshot[:] = self._model_bufs[self._pub_idx]
             
-            # 转换为旋转矩阵
-            rotation_matrix = QuaternionMath.to_rotation_matrix(model_quat)
+            # 传感器静止时姿态几乎不变，跳过顶点旋转和几何体上传
+            if q_same_rotation(self._model_snapshot, self._last_rendered, self.render_epsilon):
+                return
+            self._last_rendered[:] = self._model_snapshot
             
-            # 应用旋转到模型
-            rotated_vertices = np.dot(self.original_vertices, rotation_matrix.T)
+            # 四元数夹积直接旋转顶点和法线，写入网格缓冲区 (不经过旋转矩阵)
+            rotate_vectors(self._model_snapshot, self.original_vertices, self._vert_view)
+            rotate_vectors(self._model_snapshot, self._rest_normals, self._normal_view)
             
             # 更新立方体
-            self.sensor_mesh.vertices = o3d.utility.Vector3dVector(rotated_vertices)
-            self.sensor_mesh.compute_vertex_normals()
             self.vis.update_geometry(self.sensor_mesh)
             
         except Exception as e:
             logger.error(f"更新模型异常: {e}")
     
-    def _check_key_input(self):
-        """检查键盘输入"""
+    def _key_reader(self):
+        """后台线程阻塞读取控制台按键，渲染循环只检查标志"""
         try:
             import msvcrt
-            if msvcrt.kbhit():
-                key = msvcrt.getch().decode('utf-8').lower()
-                if key == 'r':
-                    self.request_reset()
-                    return True
-                elif key == '\x1b':  # ESC键
-                    return False
-        except:
-            pass
-        return True
+            read_key = msvcrt.getwch
+        except ImportError:
+            read_key = lambda: sys.stdin.read(1)  # 非Windows终端需回车确认
+        
+        while not self.exit_requested:
+            try:
+                key = read_key()
+            except Exception:
+                break
+            if not key:  # 标准输入已关闭
+                break
+            
+            key = key.lower()
+            if key == 'r':
+                self.request_reset()
+            elif key == '\x1b':  # ESC键
+                self.exit_requested = True
+    
+    def _start_key_reader(self):
+        """启动键盘读取线程"""
+        thread = threading.Thread(target=self._key_reader, daemon=True)
+        thread.start()
     
     def request_reset(self):
         """请求重置"""
@@ -293,15 +311,20 @@ class FinalQuaternion3DReset:
             # 启动数据处理
             self._start_data_processing()
             
+            # 启动键盘读取
+            self._start_key_reader()
+            
             print("🎮 3D可视化器已启动")
             print("💡 在控制台窗口按 R 键可重置模型位姿")
             print("💡 重置只影响模型姿态，不影响相机视角")
             
-            # 主循环
+            # 主循环 - 按显示刷新率渲染，串口线程独立以原生速率运行
             last_info_time = 0
+            render_interval = 1.0 / self.render_rate
+            next_render = time.perf_counter()
             while True:
-                # 检查键盘输入
-                if not self._check_key_input():
+                # 检查键盘输入 (由后台线程设置)
+                if self.exit_requested:
                     break
                 
                 # 更新模型姿态
@@ -318,20 +341,25 @@ class FinalQuaternion3DReset:
                 current_time = time.time()
                 if current_time - last_info_time >= 5.0:
                     last_info_time = current_time
-                    with self.data_lock:
-                        sensor_q = self.sensor_quaternion.copy()
-                        offset_q = self.offset_quaternion.copy()
-                        model_q = self.model_quaternion.copy()
+                    # 数据线程无锁写入，状态输出只取快照，偶尔读到正在更新的值不影响显示
+                    sensor_q = self.sensor_quaternion.copy()
+                    offset_q = self.offset_quaternion.copy()
+                    model_q = self._model_bufs[self._pub_idx].copy()
                     
                     print(f"📊 状态: 重置次数={self.reset_count}")
-                    print(f"   传感器四元数: w={sensor_q['w']:.3f}, x={sensor_q['x']:.3f}, y={sensor_q['y']:.3f}, z={sensor_q['z']:.3f}")
+                    print("   传感器四元数: w={:.3f}, x={:.3f}, y={:.3f}, z={:.3f}".format(*sensor_q))
                     if self.reset_count > 0:
-                        print(f"   偏移量四元数: w={offset_q['w']:.3f}, x={offset_q['x']:.3f}, y={offset_q['y']:.3f}, z={offset_q['z']:.3f}")
-                    print(f"   模型四元数: w={model_q['w']:.3f}, x={model_q['x']:.3f}, y={model_q['y']:.3f}, z={model_q['z']:.3f}")
+                        print("   偏移量四元数: w={:.3f}, x={:.3f}, y={:.3f}, z={:.3f}".format(*offset_q))
+                    print("   模型四元数: w={:.3f}, x={:.3f}, y={:.3f}, z={:.3f}".format(*model_q))
                     print(f"   公式: 模型 = 偏移量^(-1) × 传感器")
                 
-                # 小延迟
-                time.sleep(0.001)
+                # 休眠到下一个渲染节拍
+                next_render += render_interval
+                now = time.perf_counter()
+                if next_render > now:
+                    time.sleep(next_render - now)
+                else:
+                    next_render = now  # 已落后时不追帧
         
         except KeyboardInterrupt:
             print("\n用户中断")
@@ -8,18 +8,13 @@ import asyncio
 import logging
 import sys
 import time
-import math
 import numpy as np
-from pathlib import Path
-from collections import deque
 import threading
 
-# 添加src目录到路径
-sys.path.insert(0, str(Path(__file__).parent / 'src'))
-
 from src.config import Config
 from src.serial_manager import SerialManager
 from src.quaternion_processor import QuaternionProcessor
+from src.quat_kernels import smooth_rotate_step, warmup as warmup_quat_kernels
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -66,68 +61,107 @@ class Quaternion3DVisualizer:
             raise
         
         # 超响应数据传递 - 直接变量，无队列延迟
-        self.latest_quaternion = {'w': 1.0, 'x': 0.0, 'y': 0.0, 'z': 0.0}
-        self.latest_euler = {'roll': 0.0, 'pitch': 0.0, 'yaw': 0.0}
+        # 最新数据槽：四元数 [w, x, y, z]、欧拉角 [roll, pitch, yaw] (度)，原地写入不创建字典
+        # 四元数双缓冲：数据线程写入后台缓冲区再翻转 _pub_idx，渲染线程无锁读取前台缓冲区
+        self._quat_bufs = [np.array([1.0, 0.0, 0.0, 0.0]), np.array([1.0, 0.0, 0.0, 0.0])]
+        self._pub_idx = 0
+        self._pub_seq = 0   # 每发布一次加1，渲染线程据此判断是否有新数据
+        self._seen_seq = 0
+        self.latest_euler = np.zeros(3)
         self.data_count = 0
-        self.data_lock = threading.Lock()
-        self.data_updated = False
+        self.data_lock = threading.Lock()  # 仅保护速率统计
         
         # 3D对象
         self.vis = None
         self.sensor_mesh = None
         self.coordinate_frame = None
         self.trail_line = None
-        self.trail_points = deque(maxlen=200)
+        # 轨迹点环形缓冲区 (最多200个点)，避免每次更新复制全部轨迹
+        self.trail_max_points = 200
+        self._trail = np.empty((self.trail_max_points, 3))
+        self._trail_head = 0
+        self._trail_len = 0
+        self._trail_ordered = np.empty_like(self._trail)  # 按时间排序后的轨迹点
+        self.trail_scale = 0.02  # 欧拉角 (度) 到轨迹坐标的缩放
+        # 线段索引按最大容量预生成；轨迹填满后拓扑和颜色不再变化
+        segment_idx = np.arange(self.trail_max_points - 1, dtype=np.int32)
+        self._trail_lines = np.column_stack((segment_idx, segment_idx + 1))
+        self._trail_topology_len = 0
         
         # 丝滑度优化
         self.trail_update_counter = 0
         self.trail_update_interval = 30  # 减少轨迹更新频率，提高主模型丝滑度
+        self._trail_dirty = False
+        self._last_trail_rebuild = 0.0
 
         # 四元数插值优化
-        self.previous_quaternion = {'w': 1.0, 'x': 0.0, 'y': 0.0, 'z': 0.0}
+        self.previous_quaternion = np.array([1.0, 0.0, 0.0, 0.0])
         self.interpolation_enabled = True
         self.interpolation_factor = 0.15  # 插值平滑因子
+        self._interpolation_in_flight = False  # 平滑姿态尚未追上最新数据
 
         # 自适应速率检测
-        self.data_timestamps = deque(maxlen=100)  # 保存最近100个数据时间戳
+        # 数据到达间隔的在线累计 (每次速率检测后清零)
+        self._last_data_time = 0.0
+        self._iv_sum = 0.0
+        self._iv_cnt = 0
         self.detected_data_rate = 0.0
+        # 双极点平滑器的两级指数平均状态
+        self._rate_ema1 = 0.0
+        self._rate_ema2 = 0.0
         self.target_render_rate = 0.0
+        self.target_frame_interval = 0.0  # 0 表示不限制帧率
         self.adaptive_interpolation = True
         self.last_rate_update = 0
         self.rate_update_interval = 2.0  # 每2秒更新一次速率检测
+
+        # 运行状态输出
+        self.start_time = time.time()
+        self.frame_count = 0
+        self.info_interval = 3.0  # 每3秒输出一次状态
         
-        # 预计算数据
-        self.original_vertices = np.array([
-            [-1.0, -0.5, -0.25], [1.0, -0.5, -0.25], [1.0, 0.5, -0.25], [-1.0, 0.5, -0.25],
-            [-1.0, -0.5, 0.25], [1.0, -0.5, 0.25], [1.0, 0.5, 0.25], [-1.0, 0.5, 0.25]
-        ])
+        # 静止姿态顶点 (创建网格后从网格读取，保证与三角形索引顺序一致)
+        self.original_vertices = None
+        self._vert_view = None  # 与 Open3D 顶点缓冲区共享内存的视图
+        self._rest_normals = None
+        self._normal_view = None
+
+        # 预分配目标快照和上次渲染姿态，每帧原地写入
+        self._target_snapshot = np.array([1.0, 0.0, 0.0, 0.0])
+        self._last_rendered_quaternion = np.zeros(4)  # 保证首帧一定渲染
+        self.render_epsilon = 1e-7  # 1 - |点积| 低于此值视为姿态相同 (约0.05°)
+        warmup_quat_kernels()
         
         print("✅ 四元数3D可视化器初始化完成")
     
-    async def _process_data(self, raw_data: bytes):
-        """超响应数据处理 + 速率检测"""
+    def _process_data(self, raw_data: bytes):
+        """超响应数据处理 + 速率检测 (同步回调，由串口管理器在工作线程中执行)"""
         try:
-            processed_data = self.quaternion_processor.process_raw_data(raw_data)
-
-            if processed_data:
-                current_time = time.time()
+            quaternions, euler_degrees = self.quaternion_processor.process_raw_data_batch(raw_data)
+            count = len(quaternions)
 
-                # 只保留最新数据，立即更新
-                latest_point = processed_data[-1]
-                self.data_count += len(processed_data)
+            if count:
+                current_time = time.perf_counter()
+                self.data_count += count
 
-                # 记录数据时间戳用于速率检测
-                for _ in processed_data:
-                    self.data_timestamps.append(current_time)
+                # 只保留最新数据：写入后台缓冲区后翻转索引发布 (单一写入者，无需加锁)
+                # 欧拉角仅供轨迹和状态显示，直接写入
+                np.copyto(self.latest_euler, euler_degrees[-1])
+                back = 1 - self._pub_idx
+                np.copyto(self._quat_bufs[back], quaternions[-1])
+                self._pub_idx = back
+                self._pub_seq += 1
 
-                # 原子更新，最小锁定时间
                 with self.data_lock:
-                    self.latest_quaternion = latest_point['quaternion'].copy()
-                    self.latest_euler = latest_point['euler_degrees'].copy()
-                    self.data_updated = True
+                    # 累计到达间隔用于速率检测，过滤异常间隔
+                    interval = current_time - self._last_data_time
+                    self._last_data_time = current_time
+                    if 0.001 <= interval <= 1.0:
+                        self._iv_sum += interval
+                        self._iv_cnt += count
 
         except Exception as e:
-            logger.error(f"数据处理异常: {e}")
+            logger.error("数据处理异常: %s", e)
     
     def _create_visualizer(self):
         """创建可视化器"""
@@ -164,6 +198,14 @@ class Quaternion3DVisualizer:
         self.vis.add_geometry(self.coordinate_frame)
         self.vis.add_geometry(self.trail_line)
         
+        # 记录静止姿态顶点，并获取网格顶点缓冲区的视图用于原地写入
+        self.original_vertices = np.asarray(self.sensor_mesh.vertices).copy()
+        self._vert_view = np.asarray(self.sensor_mesh.vertices)
+        
+        # 纯旋转下法线与顶点同步旋转，无需逐帧重新计算
+        self._rest_normals = np.asarray(self.sensor_mesh.vertex_normals).copy()
+        self._normal_view = np.asarray(self.sensor_mesh.vertex_normals)
+        
         # 设置渲染选项
         render_option = self.vis.get_render_option()
         render_option.background_color = np.array([0.1, 0.1, 0.1])
@@ -181,44 +223,28 @@ class Quaternion3DVisualizer:
         print("✅ 3D可视化器创建完成")
 
     def _detect_data_rate(self):
-        """检测串口数据接收速率"""
+        """检测串口数据接收速率 (基于上次检测以来的累计间隔)"""
         try:
-            if len(self.data_timestamps) < 10:
-                return 0.0
-
-            # 计算最近数据的平均间隔
-            recent_timestamps = list(self.data_timestamps)[-50:]  # 最近50个数据点
-            if len(recent_timestamps) < 2:
-                return 0.0
-
-            # 计算时间间隔
-            intervals = []
-            for i in range(1, len(recent_timestamps)):
-                interval = recent_timestamps[i] - recent_timestamps[i-1]
-                if 0.001 <= interval <= 1.0:  # 过滤异常间隔
-                    intervals.append(interval)
-
-            if not intervals:
-                return 0.0
-
-            # 计算平均间隔和数据速率
-            avg_interval = sum(intervals) / len(intervals)
-            detected_rate = 1.0 / avg_interval if avg_interval > 0 else 0.0
+            with self.data_lock:
+                if self._iv_cnt < 10:
+                    return 0.0
+                interval_sum, sample_count = self._iv_sum, self._iv_cnt
+                self._iv_sum = 0.0
+                self._iv_cnt = 0
 
-            return detected_rate
+            # 数据速率 = 样本数 / 累计时间
+            return sample_count / interval_sum if interval_sum > 0 else 0.0
 
         except Exception as e:
-            logger.error(f"检测数据速率异常: {e}")
+            logger.error("检测数据速率异常: %s", e)
             return 0.0
 
-    def _update_adaptive_parameters(self):
-        """更新自适应参数"""
+    def _update_adaptive_parameters(self, now):
+        """更新自适应参数 (now 为主循环本次迭代读取的 perf_counter 时间)"""
         try:
-            current_time = time.time()
-
             # 每2秒更新一次速率检测
-            if current_time - self.last_rate_update >= self.rate_update_interval:
-                self.last_rate_update = current_time
+            if now - self.last_rate_update >= self.rate_update_interval:
+                self.last_rate_update = now
 
                 # 检测当前数据速率
                 new_detected_rate = self._detect_data_rate()
@@ -226,14 +252,18 @@ class Quaternion3DVisualizer:
                 if new_detected_rate > 0:
                     # 平滑更新检测到的速率
                     if self.detected_data_rate == 0:
+                        self._rate_ema1 = self._rate_ema2 = new_detected_rate
                         self.detected_data_rate = new_detected_rate
                     else:
-                        # 使用指数移动平均平滑速率变化
+                        # 双极点平滑 (两级指数移动平均，2*e1 - e2 抵消单级平均的滞后)
                         alpha = 0.3
-                        self.detected_data_rate = alpha * new_detected_rate + (1 - alpha) * self.detected_data_rate
+                        self._rate_ema1 += alpha * (new_detected_rate - self._rate_ema1)
+                        self._rate_ema2 += alpha * (self._rate_ema1 - self._rate_ema2)
+                        self.detected_data_rate = max(2.0 * self._rate_ema1 - self._rate_ema2, 1.0)
 
                     # 设置目标渲染速率为数据速率的2-3倍，确保丝滑
                     self.target_render_rate = self.detected_data_rate * 2.5
+                    self.target_frame_interval = 1.0 / self.target_render_rate
 
                     # 根据数据速率自适应调整插值因子
                     if self.detected_data_rate >= 200:  # 高频数据
@@ -245,117 +275,48 @@ class Quaternion3DVisualizer:
                     else:  # 很低频数据
                         self.interpolation_factor = 0.25  # 更大的插值因子，更平滑
 
-                    logger.debug(f"自适应参数更新: 数据速率={self.detected_data_rate:.1f}Hz, "
-                               f"目标渲染速率={self.target_render_rate:.1f}Hz, "
-                               f"插值因子={self.interpolation_factor:.3f}")
+                    logger.debug("自适应参数更新: 数据速率=%.1fHz, 目标渲染速率=%.1fHz, 插值因子=%.3f",
+                                 self.detected_data_rate, self.target_render_rate, self.interpolation_factor)
 
         except Exception as e:
-            logger.error(f"更新自适应参数异常: {e}")
-
-    def _slerp_quaternion(self, q1, q2, t):
-        """四元数球面线性插值 (SLERP) - 提高丝滑度"""
-        try:
-            # 计算点积
-            dot = q1['w']*q2['w'] + q1['x']*q2['x'] + q1['y']*q2['y'] + q1['z']*q2['z']
-
-            # 如果点积为负，取反其中一个四元数以选择较短路径
-            if dot < 0.0:
-                q2 = {'w': -q2['w'], 'x': -q2['x'], 'y': -q2['y'], 'z': -q2['z']}
-                dot = -dot
-
-            # 如果四元数非常接近，使用线性插值
-            if dot > 0.9995:
-                result = {
-                    'w': q1['w'] + t * (q2['w'] - q1['w']),
-                    'x': q1['x'] + t * (q2['x'] - q1['x']),
-                    'y': q1['y'] + t * (q2['y'] - q1['y']),
-                    'z': q1['z'] + t * (q2['z'] - q1['z'])
-                }
-            else:
-                # 球面线性插值
-                theta_0 = math.acos(abs(dot))
-                sin_theta_0 = math.sin(theta_0)
-                theta = theta_0 * t
-                sin_theta = math.sin(theta)
-
-                s0 = math.cos(theta) - dot * sin_theta / sin_theta_0
-                s1 = sin_theta / sin_theta_0
-
-                result = {
-                    'w': s0 * q1['w'] + s1 * q2['w'],
-                    'x': s0 * q1['x'] + s1 * q2['x'],
-                    'y': s0 * q1['y'] + s1 * q2['y'],
-                    'z': s0 * q1['z'] + s1 * q2['z']
-                }
-
-            # 归一化
-            norm = math.sqrt(result['w']**2 + result['x']**2 + result['y']**2 + result['z']**2)
-            if norm > 0:
-                result = {k: v/norm for k, v in result.items()}
-
-            return result
-
-        except Exception as e:
-            logger.error(f"四元数插值异常: {e}")
-            return q2
+            logger.error("更新自适应参数异常: %s", e)
 
     def _update_sensor_ultra_smooth(self):
-        """超丝滑传感器更新"""
+        """超丝滑传感器更新，返回几何体是否有变化"""
         try:
-            # 快速获取最新数据
-            with self.data_lock:
-                if not self.data_updated:
-                    # 没有新数据时，仍然可以进行插值平滑
-                    if self.interpolation_enabled:
-                        # 继续向目标四元数插值
-                        current_quat = self.previous_quaternion.copy()
-                    else:
-                        return
-                else:
-                    current_quat = self.latest_quaternion.copy()
-                    self.data_updated = False
-
-            # 四元数平滑插值
-            if self.interpolation_enabled:
-                smoothed_quat = self._slerp_quaternion(
-                    self.previous_quaternion,
-                    current_quat,
-                    self.interpolation_factor
-                )
-                self.previous_quaternion = smoothed_quat
-            else:
-                smoothed_quat = current_quat
-                self.previous_quaternion = current_quat
-
-            w, x, y, z = smoothed_quat['w'], smoothed_quat['x'], smoothed_quat['y'], smoothed_quat['z']
-
-            # 四元数归一化
-            norm = math.sqrt(w*w + x*x + y*y + z*z)
-            if norm > 0:
-                w, x, y, z = w/norm, x/norm, y/norm, z/norm
-
-            # 四元数到旋转矩阵
-            rotation_matrix = np.array([
-                [1-2*(y*y+z*z), 2*(x*y-w*z), 2*(x*z+w*y)],
-                [2*(x*y+w*z), 1-2*(x*x+z*z), 2*(y*z-w*x)],
-                [2*(x*z-w*y), 2*(y*z+w*x), 1-2*(x*x+y*y)]
-            ])
-
-            # 极速应用旋转
-            rotated_vertices = np.dot(self.original_vertices, rotation_matrix.T)
-
-            # 直接更新顶点
-            self.sensor_mesh.vertices = o3d.utility.Vector3dVector(rotated_vertices)
-            self.sensor_mesh.compute_vertex_normals()
+            # 没有新数据且插值已收敛时直接返回
+            seq = self._pub_seq
+            if seq == self._seen_seq and not self._interpolation_in_flight:
+                return False
+            self._seen_seq = seq
+
+            # 无锁读取前台缓冲区 (copyto 为单次 C 调用，读取期间不会被数据线程打断)
+            np.copyto(self._target_snapshot, self._quat_bufs[self._pub_idx])
+
+            # 插值 + 归一化 + 顶点/法线旋转由单个融合内核完成，原地写入网格缓冲区；
+            # 已收敛或与上次渲染姿态几乎相同时内核不更新几何体
+            t = self.interpolation_factor if self.interpolation_enabled else 1.0
+            changed, converged = smooth_rotate_step(
+                self.previous_quaternion, self._target_snapshot, self._last_rendered_quaternion,
+                t, self.render_epsilon,
+                self.original_vertices, self._vert_view, self._rest_normals, self._normal_view
+            )
+
+            # 没有新数据时继续向最新目标插值，直到与目标几乎重合
+            self._interpolation_in_flight = not converged
+            if not changed:
+                return False
 
             # 立即更新几何体
             self.vis.update_geometry(self.sensor_mesh)
+            return True
 
         except Exception as e:
-            logger.error(f"更新传感器异常: {e}")
+            logger.error("更新传感器异常: %s", e)
+            return False
     
-    def _update_trail_ultra_fast(self):
-        """超快速轨迹更新"""
+    def _update_trail_ultra_fast(self, now):
+        """超快速轨迹更新，返回轨迹线是否有变化 (now 为主循环传入的 perf_counter 时间)"""
         try:
             self.trail_update_counter += 1
             
@@ -363,32 +324,74 @@ class Quaternion3DVisualizer:
             if self.trail_update_counter >= self.trail_update_interval:
                 self.trail_update_counter = 0
                 
-                with self.data_lock:
-                    euler = self.latest_euler.copy()
-                
-                # 添加轨迹点
-                trail_point = np.array([
-                    euler['roll'] * 0.02,
-                    euler['pitch'] * 0.02,
-                    euler['yaw'] * 0.02
-                ])
-                
-                self.trail_points.append(trail_point)
-                
-                # 快速更新轨迹线
-                if len(self.trail_points) > 1:
-                    points = np.array(list(self.trail_points))
-                    lines = [[i, i + 1] for i in range(len(points) - 1)]
-                    colors = [[1.0, i/len(lines), 0.0] for i in range(len(lines))]
+                # 添加轨迹点 - 无锁读取最新欧拉角，缩放后直接写入环形缓冲区，不创建临时数组
+                np.multiply(self.latest_euler, self.trail_scale, out=self._trail[self._trail_head])
+                self._trail_head = (self._trail_head + 1) % self.trail_max_points
+                self._trail_len = min(self._trail_len + 1, self.trail_max_points)
+                self._trail_dirty = True
+            
+            # 按目标渲染速率限制重建频率，避免几何体上传堆积
+            if self._trail_dirty and self._trail_len > 1:
+                min_interval = 1.0 / max(self.target_render_rate or 60.0, 30.0)
+                if now - self._last_trail_rebuild >= min_interval:
+                    self._last_trail_rebuild = now
+                    self._trail_dirty = False
                     
+                    # 快速更新轨迹线
+                    points = self._get_trail_points()
                     self.trail_line.points = o3d.utility.Vector3dVector(points)
-                    self.trail_line.lines = o3d.utility.Vector2iVector(lines)
-                    self.trail_line.colors = o3d.utility.Vector3dVector(colors)
+                    
+                    # 仅在点数变化时重建线段和渐变颜色
+                    if len(points) != self._trail_topology_len:
+                        self._trail_topology_len = len(points)
+                        segment_count = len(points) - 1
+                        colors = np.zeros((segment_count, 3))
+                        colors[:, 0] = 1.0
+                        colors[:, 1] = np.arange(segment_count) / segment_count
+                        
+                        self.trail_line.lines = o3d.utility.Vector2iVector(self._trail_lines[:segment_count])
+                        self.trail_line.colors = o3d.utility.Vector3dVector(colors)
                     
                     self.vis.update_geometry(self.trail_line)
+                    return True
+            
+            return False
                 
         except Exception as e:
-            logger.error(f"更新轨迹异常: {e}")
+            logger.error("更新轨迹异常: %s", e)
+            return False
+    
+    def _get_trail_points(self):
+        """按时间顺序返回环形缓冲区中的轨迹点"""
+        if self._trail_len < self.trail_max_points:
+            return self._trail[:self._trail_len]
+        head = self._trail_head
+        return np.concatenate((self._trail[head:], self._trail[:head]), out=self._trail_ordered)
+    
+    async def _run_serial_with_info(self):
+        """运行串口接收，同时在同一事件循环中定期输出状态"""
+        info_task = asyncio.create_task(self._info_loop())
+        try:
+            await self.serial_manager.start()
+        finally:
+            info_task.cancel()
+
+    async def _info_loop(self):
+        """定期输出运行状态，不占用渲染主循环"""
+        while True:
+            await asyncio.sleep(self.info_interval)
+
+            elapsed = time.time() - self.start_time
+
+            with self.data_lock:
+                data_count = self.data_count
+                roll, pitch, yaw = self.latest_euler.tolist()
+
+            render_fps = self.frame_count / elapsed if elapsed > 0 else 0
+
+            print(f"🎯 自适应运行: 渲染FPS={render_fps:.0f}, 数据={data_count}, 检测速率={self.detected_data_rate:.1f}Hz")
+            print(f"   目标渲染={self.target_render_rate:.1f}Hz, 插值因子={self.interpolation_factor:.3f}")
+            print(f"   姿态: Roll={roll:.1f}°, Pitch={pitch:.1f}°, Yaw={yaw:.1f}°")
     
     def start_data_processing(self):
         """启动数据处理"""
@@ -398,9 +401,9 @@ class Quaternion3DVisualizer:
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
             try:
-                loop.run_until_complete(self.serial_manager.start())
+                loop.run_until_complete(self._run_serial_with_info())
             except Exception as e:
-                logger.error(f"数据处理异常: {e}")
+                logger.error("数据处理异常: %s", e)
             finally:
                 loop.close()
         
@@ -433,6 +436,10 @@ class Quaternion3DVisualizer:
             # 创建可视化器
             self._create_visualizer()
             
+            # 运行统计 (由状态输出任务读取)
+            self.start_time = time.time()
+            self.frame_count = 0
+            
             # 启动数据处理
             self.start_data_processing()
             
@@ -447,69 +454,37 @@ class Quaternion3DVisualizer:
 模型现在应该瞬间响应传感器动作！
 """)
             
-            # 自适应超丝滑主循环
-            start_time = time.time()
-            last_info_time = 0
-            frame_count = 0
-            last_frame_time = 0
+            # 自适应超丝滑主循环 - 按截止时间休眠到下一帧
+            next_frame = time.perf_counter()
 
             while True:
-                current_time = time.time()
-
-                # 更新自适应参数
-                self._update_adaptive_parameters()
-
-                # 计算自适应帧间隔
-                if self.target_render_rate > 0:
-                    target_frame_interval = 1.0 / self.target_render_rate
-                else:
-                    target_frame_interval = 0  # 无限制
-
-                # 自适应帧率控制
-                if target_frame_interval > 0:
-                    frame_elapsed = current_time - last_frame_time
-                    if frame_elapsed < target_frame_interval:
-                        # 如果还没到下一帧时间，继续处理但不强制渲染
-                        pass
-                    else:
-                        last_frame_time = current_time
-                else:
-                    # 无限制模式
-                    last_frame_time = current_time
+                # 迭代开始时读取一次时间，传给各更新函数，避免各自重复读取
+                now = time.perf_counter()
+
+                # 更新自适应参数 (目标帧间隔每2秒才可能变化)
+                self._update_adaptive_parameters(now)
 
                 # 立即更新可视化（自适应超丝滑模式）
-                self._update_sensor_ultra_smooth()
-                self._update_trail_ultra_fast()
+                sensor_changed = self._update_sensor_ultra_smooth()
+                trail_changed = self._update_trail_ultra_fast(now)
 
-                # 检查窗口事件
+                # 检查窗口事件 (视角交互引起的重绘由 poll_events 自行处理)
                 if not self.vis.poll_events():
                     break
 
-                # 渲染
-                self.vis.update_renderer()
-                frame_count += 1
-
-                # 显示信息
-                if current_time - last_info_time >= 3.0:
-                    last_info_time = current_time
-                    elapsed = current_time - start_time
-
-                    with self.data_lock:
-                        data_count = self.data_count
-                        euler = self.latest_euler.copy()
-
-                    data_rate = data_count / elapsed if elapsed > 0 else 0
-                    render_fps = frame_count / elapsed if elapsed > 0 else 0
-
-                    print(f"🎯 自适应运行: 渲染FPS={render_fps:.0f}, 数据={data_count}, 检测速率={self.detected_data_rate:.1f}Hz")
-                    print(f"   目标渲染={self.target_render_rate:.1f}Hz, 插值因子={self.interpolation_factor:.3f}")
-                    print(f"   姿态: Roll={euler['roll']:.1f}°, Pitch={euler['pitch']:.1f}°, Yaw={euler['yaw']:.1f}°")
-
-                # 自适应微延迟（根据目标速率）
-                if target_frame_interval > 0.001:  # 如果目标间隔大于1ms
-                    sleep_time = max(0, target_frame_interval * 0.1)  # 睡眠目标间隔的10%
-                    if sleep_time > 0:
-                        time.sleep(sleep_time)
+                # 仅在几何体有变化时渲染，无新数据时不提交GPU工作
+                if sensor_changed or trail_changed:
+                    self.vis.update_renderer()
+                    self.frame_count += 1
+
+                # 休眠到下一帧截止时间，预留0.5ms吸收调度抖动；未检测到速率时间隔为0，不限速
+                next_frame += self.target_frame_interval
+                now = time.perf_counter()
+                remaining = next_frame - now - 0.0005
+                if remaining > 0:
+                    time.sleep(remaining)
+                elif next_frame < now:
+                    next_frame = now  # 已落后时不追帧
         
         except KeyboardInterrupt:
             print("\n用户中断")
@@ -527,16 +502,20 @@ class Quaternion3DVisualizer:
 
 
 def main():
-    """主函数 - 支持环境变量配置"""
+    """主函数 - 支持命令行参数和环境变量配置"""
     import os
 
-    # 检查是否有环境变量配置 (来自启动器)
-    env_port = os.environ.get('ADAPTIVE_PORT')
-    env_baudrate = os.environ.get('ADAPTIVE_BAUDRATE')
-    env_format = os.environ.get('ADAPTIVE_FORMAT')
+    # 优先使用命令行参数 (启动器以子进程方式启动时传入: 端口 波特率 格式)
+    if len(sys.argv) >= 4:
+        env_port, env_baudrate, env_format = sys.argv[1:4]
+    else:
+        # 兼容旧版启动器的环境变量配置
+        env_port = os.environ.get('ADAPTIVE_PORT')
+        env_baudrate = os.environ.get('ADAPTIVE_BAUDRATE')
+        env_format = os.environ.get('ADAPTIVE_FORMAT')
 
     if env_port and env_baudrate and env_format:
-        # 从环境变量启动 (启动器模式)
+        # 从启动器配置启动 (启动器模式)
         print(f"🎯 自适应Open3D可视化器 - 启动器模式")
         print(f"   端口: {env_port}")
         print(f"   波特率: {env_baudrate}")
@@ -591,7 +570,7 @@ def main():
             print("❌ 无效选择")
 
     except Exception as e:
-        logger.error(f"程序异常: {e}")
+        logger.error("程序异常: %s", e)
         import traceback
         traceback.print_exc()
 
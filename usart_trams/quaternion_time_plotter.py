@@ -5,14 +5,11 @@
 支持手动选择端口号和波特率
 """
 
-import asyncio
 import logging
-import sys
+import multiprocessing as mp
 import time
 import numpy as np
-from pathlib import Path
 from collections import deque
-import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 import matplotlib.pyplot as plt
@@ -20,12 +17,10 @@ from matplotlib.animation import FuncAnimation
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import serial.tools.list_ports
 
-# 添加src目录到路径
-sys.path.insert(0, str(Path(__file__).parent / 'src'))
-
 from src.config import Config
-from src.serial_manager import SerialManager
-from src.quaternion_processor import QuaternionProcessor
+from src.plot_helpers import minmax_decimate, hysteresis_limits
+from src.ring_buffer import SharedRingBuffer
+from src.serial_process import SerialProcess, HISTORY_DTYPE, Q_SCALE
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -40,23 +35,20 @@ class QuaternionTimePlotter:
         self.root.title("四元数时间轴绘图工具")
         self.root.geometry("1200x800")
         
-        # 数据存储 - 移除长度限制，保持所有历史数据
-        self.time_data = []  # 保存所有时间数据
-        self.w_data = []     # 保存所有W分量数据
-        self.x_data = []     # 保存所有X分量数据
-        self.y_data = []     # 保存所有Y分量数据
-        self.z_data = []     # 保存所有Z分量数据
+        # 数据存储 - 共享内存中预分配的环形缓冲区，每条记录 (t, Q1.15 定点 [w, x, y, z])
+        # 由串口采集子进程写入，本进程只读；容量内保持全部历史数据，超出后覆盖最旧的数据
+        self.history_capacity = 1_000_000
+        self.history = SharedRingBuffer(self.history_capacity, dtype=HISTORY_DTYPE)
 
         # 显示控制
         self.show_all_data = True  # 是否显示所有数据
         self.window_size = 30      # 滚动窗口大小（秒）
         
-        # 状态变量
+        # 状态变量 (计时起点和数据计数与采集子进程共享)
         self.is_running = False
-        self.start_time = None
-        self.data_count = 0
-        self.serial_manager = None
-        self.quaternion_processor = None
+        self.start_time = mp.RawValue('d', time.time())
+        self.data_count = mp.RawValue('q', 0)
+        self.serial_process = None
         
         # 创建界面
         self.create_widgets()
@@ -65,6 +57,10 @@ class QuaternionTimePlotter:
         # 扫描可用端口
         self.scan_ports()
         
+        # 状态标签由GUI线程定时刷新，采集子进程只更新计数
+        self.status_refresh_ms = 100
+        self.root.after(self.status_refresh_ms, self._refresh_status)
+        
     def create_widgets(self):
         """创建界面组件"""
         # 控制面板
@@ -163,17 +159,18 @@ class QuaternionTimePlotter:
         self.y_line, = self.axes[1, 0].plot([], [], 'b-', linewidth=1.5, label='Y')
         self.z_line, = self.axes[1, 1].plot([], [], 'm-', linewidth=1.5, label='Z')
         
-        # 设置坐标轴范围
+        # 设置坐标轴范围 (缓存当前范围，只在变化时更新)
+        self._limits = ((0, 30), (-1.2, 1.2))  # 显示最近30秒，四元数范围
         for ax in self.axes.flat:
-            ax.set_xlim(0, 30)  # 显示最近30秒
-            ax.set_ylim(-1.2, 1.2)  # 四元数范围
+            ax.set_xlim(*self._limits[0])
+            ax.set_ylim(*self._limits[1])
         
         # 嵌入到tkinter
         self.canvas = FigureCanvasTkAgg(self.fig, self.root)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
-        # 启动动画
-        self.animation = FuncAnimation(self.fig, self.update_plot, interval=50, blit=False)
+        # 启动动画 (blit 只重绘线条，坐标轴范围变化时由 _apply_limits 整图重绘)
+        self.animation = FuncAnimation(self.fig, self.update_plot, interval=50, blit=True)
         
     def scan_ports(self):
         """扫描可用串口"""
@@ -223,20 +220,16 @@ class QuaternionTimePlotter:
             config.processing.data_format = data_format
             config.processing.enable_filtering = False  # 绘图时不使用滤波
             
-            # 初始化处理器
-            self.quaternion_processor = QuaternionProcessor(config)
-            self.quaternion_processor.set_data_format(data_format)
-            self.serial_manager = SerialManager(config, self.process_data)
+            # 已有历史数据时沿用原计时起点，保证时间列单调递增 (窗口二分查找和坐标轴范围依赖于此)
+            if not len(self.history):
+                self.start_time.value = time.time()
+                self.data_count.value = 0
             
-            # 启动数据处理线程
-            self.start_time = time.time()
-            self.data_count = 0
+            # 启动串口采集子进程 (串口接收和解析不占用GUI进程的 GIL)
+            self.serial_process = SerialProcess(config, self.history, self.start_time, self.data_count)
+            self.serial_process.start()
             self.is_running = True
             
-            # 启动异步数据处理
-            self.data_thread = threading.Thread(target=self.run_data_processing, daemon=True)
-            self.data_thread.start()
-            
             # 更新界面
             self.start_button.config(state=tk.DISABLED)
             self.stop_button.config(state=tk.NORMAL)
@@ -255,12 +248,10 @@ class QuaternionTimePlotter:
             
         self.is_running = False
         
-        if self.serial_manager:
-            try:
-                # 停止串口管理器
-                asyncio.run(self.serial_manager.stop())
-            except:
-                pass
+        if self.serial_process:
+            # 通知采集子进程停止并等待退出
+            self.serial_process.stop()
+            self.serial_process = None
             
         # 更新界面
         self.start_button.config(state=tk.NORMAL)
@@ -271,73 +262,43 @@ class QuaternionTimePlotter:
         
     def clear_data(self):
         """清空数据"""
-        self.time_data = []
-        self.w_data = []
-        self.x_data = []
-        self.y_data = []
-        self.z_data = []
-        
-        self.data_count = 0
-        self.start_time = time.time()
+        if self.serial_process:
+            # 采集子进程运行中时由其执行清空，共享缓冲区始终只有一个写入方
+            self.serial_process.request_clear()
+        else:
+            self.history.clear()
+            self.data_count.value = 0
+            self.start_time.value = time.time()
         
         self.data_label.config(text="数据: 0")
         self.rate_label.config(text="速率: 0 Hz")
         
         logger.info("数据已清空")
         
-    def run_data_processing(self):
-        """运行数据处理"""
-        try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(self.serial_manager.start())
-        except Exception as e:
-            logger.error(f"数据处理异常: {e}")
-        finally:
-            loop.close()
-            
-    async def process_data(self, raw_data: bytes):
-        """处理数据"""
-        try:
-            processed_data = self.quaternion_processor.process_raw_data(raw_data)
-            
-            if processed_data:
-                current_time = time.time()
-                
-                for data_point in processed_data:
-                    self.data_count += 1
-                    
-                    # 添加数据点 - 保存所有历史数据
-                    relative_time = current_time - self.start_time
-                    quat = data_point['quaternion']
-
-                    self.time_data.append(relative_time)
-                    self.w_data.append(quat['w'])
-                    self.x_data.append(quat['x'])
-                    self.y_data.append(quat['y'])
-                    self.z_data.append(quat['z'])
-                    
-                # 更新状态显示
-                elapsed = current_time - self.start_time
-                rate = self.data_count / elapsed if elapsed > 0 else 0
-                
-                self.root.after(0, lambda: self.data_label.config(text=f"数据: {self.data_count}"))
-                self.root.after(0, lambda: self.rate_label.config(text=f"速率: {rate:.1f} Hz"))
-                
-        except Exception as e:
-            logger.error(f"处理数据异常: {e}")
-            
+    def _refresh_status(self):
+        """定时刷新数据计数和速率标签 (在GUI线程中执行)"""
+        if self.is_running:
+            data_count = self.data_count.value
+            elapsed = time.time() - self.start_time.value
+            rate = data_count / elapsed if elapsed > 0 else 0
+            self.data_label.config(text=f"数据: {data_count}")
+            self.rate_label.config(text=f"速率: {rate:.1f} Hz")
+        self.root.after(self.status_refresh_ms, self._refresh_status)
+        
     def update_plot(self, frame):
         """更新绘图 - 支持全部数据和滚动窗口两种模式"""
-        if not self.time_data:
-            return
+        lines = (self.w_line, self.x_line, self.y_line, self.z_line)
+        if not len(self.history):
+            return lines
 
-        # 转换为numpy数组
-        times = np.array(self.time_data)
-        w_vals = np.array(self.w_data)
-        x_vals = np.array(self.x_data)
-        y_vals = np.array(self.y_data)
-        z_vals = np.array(self.z_data)
+        # 从环形缓冲区取按时间排序的连续数据，各字段/分量为零拷贝切片 (四元数仍为 int16 定点)
+        data = self.history.view()
+        times = data['t']
+        quats = data['q']
+        w_vals = quats[:, 0]
+        x_vals = quats[:, 1]
+        y_vals = quats[:, 2]
+        z_vals = quats[:, 3]
 
         # 根据显示模式选择数据范围
         if self.show_all_data:
@@ -348,52 +309,69 @@ class QuaternionTimePlotter:
             display_y = y_vals
             display_z = z_vals
 
-            # 设置X轴范围为全部数据
-            if len(times) > 0:
-                x_min = max(0, times[0] - 1)
-                x_max = times[-1] + 1
-                for ax in self.axes.flat:
-                    ax.set_xlim(x_min, x_max)
+            # 设置X轴范围为全部数据，超出当前范围时一次预留10%余量，避免每帧改动坐标轴
+            x_min = max(0.0, float(times[0]) - 1)
+            x_max = float(times[-1]) + 1
+            cur_min, cur_max = self._limits[0]
+            if x_min == cur_min and x_max <= cur_max:
+                xlim = (cur_min, cur_max)
+            else:
+                xlim = (x_min, x_max + 0.1 * (x_max - x_min))
         else:
             # 滚动窗口模式
-            if len(times) > 0:
-                max_time = times[-1]
-                # 找到窗口范围内的数据
-                window_start = max_time - self.window_size
-                mask = times >= window_start
+            max_time = float(times[-1])
+            # 时间单调递增，二分查找窗口起点后直接切片 (视图，无需布尔掩码和拷贝)
+            window_start = max_time - self.window_size
+            start = np.searchsorted(times, window_start, side='left')
 
-                display_times = times[mask]
-                display_w = w_vals[mask]
-                display_x = x_vals[mask]
-                display_y = y_vals[mask]
-                display_z = z_vals[mask]
+            display_times = times[start:]
+            display_w = w_vals[start:]
+            display_x = x_vals[start:]
+            display_y = y_vals[start:]
+            display_z = z_vals[start:]
 
-                # 设置X轴范围为窗口大小
-                for ax in self.axes.flat:
-                    ax.set_xlim(window_start, max_time + 1)
+            # X轴范围按窗口大小的10%步进：最新数据超出右边界或窗口大小改变时才整体右移
+            step = 0.1 * self.window_size
+            cur_min, cur_max = self._limits[0]
+            if (cur_min <= window_start and max_time + 1 <= cur_max
+                    and cur_max - cur_min <= self.window_size + 1 + step + 1e-9):
+                xlim = (cur_min, cur_max)
             else:
-                display_times = times
-                display_w = w_vals
-                display_x = x_vals
-                display_y = y_vals
-                display_z = z_vals
+                xlim = (window_start, max_time + 1 + step)
 
-        # 更新线条数据
-        self.w_line.set_data(display_times, display_w)
-        self.x_line.set_data(display_times, display_x)
-        self.y_line.set_data(display_times, display_y)
-        self.z_line.set_data(display_times, display_z)
+        # 点数远超坐标轴像素宽度时按最小/最大值抽稀，绘制开销不再随历史数据增长
+        n_bins = max(int(self.axes[0, 0].bbox.width), 1)
+        display_times, display_w, display_x, display_y, display_z = minmax_decimate(
+            display_times, (display_w, display_x, display_y, display_z), n_bins
+        )
 
-        # 动态调整Y轴范围以适应数据
+        # 动态调整Y轴范围以适应数据：逐分量在定点数据上求极值再合并，不拼接临时数组
+        # (抽稀保留了每块的最小/最大值，极值与原始数据一致)
+        components = (display_w, display_x, display_y, display_z)
         if len(display_w) > 0:
-            all_vals = np.concatenate([display_w, display_x, display_y, display_z])
-            y_min = np.min(all_vals) - 0.1
-            y_max = np.max(all_vals) + 0.1
+            y_min = min(int(c.min()) for c in components) / Q_SCALE
+            y_max = max(int(c.max()) for c in components) / Q_SCALE
+            ylim = hysteresis_limits(y_min - 0.1, y_max + 0.1, self._limits[1])
+        else:
+            ylim = self._limits[1]
 
-            for ax in self.axes.flat:
-                ax.set_ylim(y_min, y_max)
+        # 抽稀后的少量点再换算回浮点数，更新线条数据
+        scale = 1.0 / Q_SCALE
+        for line, values in zip(lines, components):
+            line.set_data(display_times, values * scale)
 
-        return self.w_line, self.x_line, self.y_line, self.z_line
+        self._apply_limits(xlim, ylim)
+        return lines
+
+    def _apply_limits(self, xlim, ylim):
+        """坐标轴范围变化时才更新并整图重绘 (刷新刻度和 blit 背景)，否则只 blit 线条"""
+        if (xlim, ylim) == self._limits:
+            return
+        self._limits = (xlim, ylim)
+        for ax in self.axes.flat:
+            ax.set_xlim(*xlim)
+            ax.set_ylim(*ylim)
+        self.canvas.draw()
         
     def on_closing(self):
         """关闭程序"""
@@ -401,6 +379,17 @@ class QuaternionTimePlotter:
             self.stop_plotting()
         self.root.quit()
         self.root.destroy()
+
+        # 采集子进程已退出，释放共享内存；未抽稀时线条数据是共享内存上的视图，需先释放
+        self.animation.event_source.stop()
+        for line in (self.w_line, self.x_line, self.y_line, self.z_line):
+            line.set_data([], [])
+        try:
+            self.history.close()
+        except BufferError as e:
+            logger.warning(f"共享内存仍被引用，跳过关闭: {e}")
+        finally:
+            self.history.unlink()
         
     def run(self):
         """运行程序"""
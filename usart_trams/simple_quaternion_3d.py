@@ -8,18 +8,13 @@
 import asyncio
 import logging
 import sys
-import time
-import math
 import numpy as np
-from pathlib import Path
 import threading
 
-# 添加src目录到路径
-sys.path.insert(0, str(Path(__file__).parent / 'src'))
-
 from src.config import Config
 from src.serial_manager import SerialManager
 from src.quaternion_processor import QuaternionProcessor
+from src.quat_kernels import rotate_vectors, warmup as warmup_quat_kernels
 
 # 配置日志
 logging.basicConfig(level=logging.WARNING)  # 减少日志输出
@@ -53,35 +48,45 @@ class SimpleQuaternion3D:
         self.quaternion_processor.set_data_format('ascii')
         self.serial_manager = SerialManager(self.config, self._process_data)
         
-        # 当前四元数数据
-        self.current_quaternion = {'w': 1.0, 'x': 0.0, 'y': 0.0, 'z': 0.0}
-        self.data_lock = threading.Lock()
-        self.data_updated = False
+        # 当前四元数 [w, x, y, z] - 单写单读的序列锁槽位，无需加锁
+        # 写入期间序号为奇数，读取方发现序号为奇数或读取前后不一致时留到下一帧再读
+        self._q_slot = np.array([1.0, 0.0, 0.0, 0.0])
+        self._seq = 0
+        self._seen_seq = 0
+        self._data_event = threading.Event()  # 有新数据时唤醒渲染循环
+        
+        # 数据线程及其事件循环 (停止时通过 call_soon_threadsafe 跨线程通知)
+        self._data_thread = None
+        self._loop = None
+        self._stop_requested = None  # asyncio.Event，在数据线程的事件循环内创建
         
         # 3D对象
         self.vis = None
         self.sensor_mesh = None
         
-        # 预计算的立方体顶点
-        self.original_vertices = np.array([
-            [-1.0, -0.5, -0.25], [1.0, -0.5, -0.25], [1.0, 0.5, -0.25], [-1.0, 0.5, -0.25],
-            [-1.0, -0.5, 0.25], [1.0, -0.5, 0.25], [1.0, 0.5, 0.25], [-1.0, 0.5, 0.25]
-        ])
+        # 立方体初始顶点和法线 (创建网格后从网格读取，保证与网格顶点顺序一致)
+        self.original_vertices = None
+        self._rest_normals = None
+        self._vert_view = None    # 与 Open3D 顶点缓冲区共享内存的视图
+        self._normal_view = None  # 与 Open3D 法线缓冲区共享内存的视图
+        
+        # 预分配四元数缓冲区，每帧原地写入
+        self._quat = np.empty(4)
+        warmup_quat_kernels()
         
         print("✅ 初始化完成")
     
     async def _process_data(self, raw_data: bytes):
         """处理串口数据"""
         try:
-            processed_data = self.quaternion_processor.process_raw_data(raw_data)
+            # 只解析最新数据
+            latest = self.quaternion_processor.process_raw_data_latest(raw_data)
             
-            if processed_data:
-                # 只保留最新数据
-                latest_point = processed_data[-1]
-                
-                with self.data_lock:
-                    self.current_quaternion = latest_point['quaternion'].copy()
-                    self.data_updated = True
+            if latest is not None:
+                self._seq += 1  # 奇数: 写入中
+                np.copyto(self._q_slot, latest)
+                self._seq += 1
+                self._data_event.set()
         
         except Exception as e:
             logger.error(f"数据处理异常: {e}")
@@ -111,6 +116,14 @@ class SimpleQuaternion3D:
         self.sensor_mesh.paint_uniform_color([0.2, 0.6, 1.0])  # 蓝色
         self.sensor_mesh.compute_vertex_normals()
         
+        # 缓存初始顶点和法线：刚体旋转不改变形状，法线只需随顶点一起旋转，无需每帧重新计算
+        self.original_vertices = np.asarray(self.sensor_mesh.vertices).copy()
+        self._rest_normals = np.asarray(self.sensor_mesh.vertex_normals).copy()
+        
+        # 旋转结果直接写入网格自身的缓冲区，每帧不再构造 Vector3dVector
+        self._vert_view = np.asarray(self.sensor_mesh.vertices)
+        self._normal_view = np.asarray(self.sensor_mesh.vertex_normals)
+        
         # 创建坐标轴
         coordinate_frame = o3d.geometry.TriangleMesh.create_coordinate_frame(size=2.0)
         
@@ -133,56 +146,74 @@ class SimpleQuaternion3D:
         print("✅ 3D可视化器创建完成")
     
     def _update_sensor(self):
-        """更新传感器姿态"""
+        """更新传感器姿态，返回几何体是否有变化"""
         try:
-            # 获取最新四元数
-            with self.data_lock:
-                if not self.data_updated:
-                    return
-                quat = self.current_quaternion.copy()
-                self.data_updated = False
-            
-            w, x, y, z = quat['w'], quat['x'], quat['y'], quat['z']
-            
-            # 四元数归一化
-            norm = math.sqrt(w*w + x*x + y*y + z*z)
-            if norm > 0:
-                w, x, y, z = w/norm, x/norm, y/norm, z/norm
+            # 获取最新四元数 (无新数据或正在写入时直接返回；写入方完成后会再次置位事件)
+            seq = self._seq
+            if seq == self._seen_seq or seq & 1:
+                return False
+            np.copyto(self._quat, self._q_slot)
+            if self._seq != seq:
+                return False  # 读取期间被改写，下一帧重读
+            self._seen_seq = seq
             
-            # 四元数转旋转矩阵
-            rotation_matrix = np.array([
-                [1-2*(y*y+z*z), 2*(x*y-w*z), 2*(x*z+w*y)],
-                [2*(x*y+w*z), 1-2*(x*x+z*z), 2*(y*z-w*x)],
-                [2*(x*z-w*y), 2*(y*z+w*x), 1-2*(x*x+y*y)]
-            ])
-            
-            # 应用旋转
-            rotated_vertices = np.dot(self.original_vertices, rotation_matrix.T)
+            # 归一化 + 四元数夹积旋转顶点和法线由 JIT 内核完成，不构建旋转矩阵，
+            # 结果原地写入网格缓冲区 (法线随顶点旋转，不再调用 compute_vertex_normals)
+            rotate_vectors(self._quat, self.original_vertices, self._vert_view)
+            rotate_vectors(self._quat, self._rest_normals, self._normal_view)
             
             # 更新立方体
-            self.sensor_mesh.vertices = o3d.utility.Vector3dVector(rotated_vertices)
-            self.sensor_mesh.compute_vertex_normals()
             self.vis.update_geometry(self.sensor_mesh)
+            return True
             
         except Exception as e:
             logger.error(f"更新传感器异常: {e}")
+            return False
+    
+    async def _run_serial(self):
+        """运行串口接收，收到停止请求后在同一事件循环内停止串口管理器"""
+        # Python 3.8/3.9 的 Event 绑定创建时所在的事件循环，必须在数据线程的循环内创建
+        self._stop_requested = asyncio.Event()
+        serial_task = asyncio.create_task(self.serial_manager.start())
+        stop_task = asyncio.create_task(self._stop_requested.wait())
+        await asyncio.wait({serial_task, stop_task}, return_when=asyncio.FIRST_COMPLETED)
+        stop_task.cancel()
+        await self.serial_manager.stop()
+        await asyncio.gather(serial_task, return_exceptions=True)
     
     def _start_data_processing(self):
         """启动数据处理线程"""
         def run_async():
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
+            self._loop = loop
             try:
-                loop.run_until_complete(self.serial_manager.start())
+                loop.run_until_complete(self._run_serial())
             except Exception as e:
                 logger.error(f"数据处理异常: {e}")
             finally:
                 loop.close()
         
-        thread = threading.Thread(target=run_async, daemon=True)
-        thread.start()
+        self._data_thread = threading.Thread(target=run_async, daemon=True)
+        self._data_thread.start()
         print("✅ 数据处理已启动")
     
+    def _request_stop(self):
+        """在数据线程的事件循环中执行：置位停止标志"""
+        if self._stop_requested is not None:
+            self._stop_requested.set()
+    
+    def _stop_data_processing(self):
+        """停止数据处理：在数据线程的事件循环中置位停止标志 (不另建事件循环)，并限时等待线程退出"""
+        loop = self._loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(self._request_stop)
+            except RuntimeError:
+                pass  # 事件循环已关闭
+        if self._data_thread is not None:
+            self._data_thread.join(timeout=1.0)
+    
     def run(self):
         """运行可视化器"""
         print(f"""
@@ -212,26 +243,27 @@ class SimpleQuaternion3D:
             
             print("🎮 3D可视化器已启动，立方体将跟随四元数数据旋转")
             
-            # 主循环
+            # 主循环 - 由新数据驱动，空闲时阻塞等待而不是空转
+            event_interval = 1.0 / 60  # 无数据时至少按60Hz处理窗口事件
             while True:
-                # 更新传感器姿态
-                self._update_sensor()
+                # 等待新数据，超时后仅处理窗口事件 (视角交互)
+                if self._data_event.wait(timeout=event_interval):
+                    self._data_event.clear()
+                    
+                    # 更新传感器姿态，几何体确有变化时才请求重绘
+                    if self._update_sensor():
+                        self.vis.update_renderer()
                 
-                # 检查窗口事件
+                # 检查窗口事件 (同时完成渲染)
                 if not self.vis.poll_events():
                     break
-                
-                # 渲染
-                self.vis.update_renderer()
-                
-                # 小延迟
-                time.sleep(0.001)
         
         except KeyboardInterrupt:
             print("\n用户中断")
         except Exception as e:
             print(f"❌ 运行异常: {e}")
         finally:
+            self._stop_data_processing()
             try:
                 if self.vis:
                     self.vis.destroy_window()
@@ -6,17 +6,13 @@
 
 import asyncio
 import logging
-import sys
 import time
 import csv
-from pathlib import Path
+import numpy as np
 from collections import deque
 import threading
 import serial.tools.list_ports
 
-# 添加src目录到路径
-sys.path.insert(0, str(Path(__file__).parent / 'src'))
-
 from src.config import Config
 from src.serial_manager import SerialManager
 from src.quaternion_processor import QuaternionProcessor
@@ -126,37 +122,26 @@ class SimpleQuaternionPlotter:
     async def process_data(self, raw_data: bytes):
         """处理数据"""
         try:
-            processed_data = self.quaternion_processor.process_raw_data(raw_data)
+            quaternions, euler_degrees = self.quaternion_processor.process_raw_data_batch(raw_data)
+            count = len(quaternions)
             
-            if processed_data:
+            if count:
                 current_time = time.time()
+                previous_count = self.data_count
+                self.data_count += count
                 
-                for data_point in processed_data:
-                    self.data_count += 1
-                    
-                    # 记录数据
-                    relative_time = current_time - self.start_time
-                    quat = data_point['quaternion']
-                    euler = data_point['euler_degrees']
-                    
-                    data_record = {
-                        'time': relative_time,
-                        'w': quat['w'],
-                        'x': quat['x'],
-                        'y': quat['y'],
-                        'z': quat['z'],
-                        'roll': euler['roll'],
-                        'pitch': euler['pitch'],
-                        'yaw': euler['yaw']
-                    }
-                    
-                    self.data_storage.append(data_record)
-                    
-                    # 实时显示
-                    if self.data_count % 10 == 0:  # 每10个数据点显示一次
-                        rate = self.data_count / relative_time if relative_time > 0 else 0
-                        print(f"\r📊 时间: {relative_time:.1f}s | 数据: {self.data_count} | 速率: {rate:.1f} Hz | "
-                              f"四元数: w={quat['w']:.3f}, x={quat['x']:.3f}, y={quat['y']:.3f}, z={quat['z']:.3f}", end="")
+                # 记录数据：整批拼成 [time, w, x, y, z, roll, pitch, yaw] 行
+                relative_time = current_time - self.start_time
+                self.data_storage.extend(
+                    np.column_stack((np.full(count, relative_time), quaternions, euler_degrees)).tolist()
+                )
+                
+                # 实时显示
+                if self.data_count // 10 != previous_count // 10:  # 每10个数据点显示一次
+                    w, x, y, z = quaternions[-1]
+                    rate = self.data_count / relative_time if relative_time > 0 else 0
+                    print(f"\r📊 时间: {relative_time:.1f}s | 数据: {self.data_count} | 速率: {rate:.1f} Hz | "
+                          f"四元数: w={w:.3f}, x={x:.3f}, y={y:.3f}, z={z:.3f}", end="")
                 
         except Exception as e:
             logger.error(f"处理数据异常: {e}")
@@ -166,11 +151,10 @@ class SimpleQuaternionPlotter:
         try:
             with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
                 fieldnames = ['time', 'w', 'x', 'y', 'z', 'roll', 'pitch', 'yaw']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                writer = csv.writer(csvfile)
                 
-                writer.writeheader()
-                for record in self.data_storage:
-                    writer.writerow(record)
+                writer.writerow(fieldnames)
+                writer.writerows(self.data_storage)
                     
             print(f"\n✅ 数据已保存到: {filename}")
             print(f"   总记录数: {len(self.data_storage)}")
@@ -11,14 +11,11 @@ import sys
 import time
 import math
 import numpy as np
-from pathlib import Path
 import threading
 
-# 添加src目录到路径
-sys.path.insert(0, str(Path(__file__).parent / 'src'))
-
 from src.config import Config
 from src.serial_manager import SerialManager
+from src.quat_kernels import rotate_vectors, warmup as warmup_quat_kernels
 
 # 配置日志
 logging.basicConfig(level=logging.WARNING)
@@ -202,6 +199,11 @@ class SixAxis3DVisualizer:
             [-1.0, -0.5, 0.25], [1.0, -0.5, 0.25], [1.0, 0.5, 0.25], [-1.0, 0.5, 0.25]
         ])
         
+        # 预分配四元数和顶点缓冲区，每帧原地写入
+        self._quat = np.empty(4)
+        self._rotated_vertices = np.empty_like(self.original_vertices)
+        warmup_quat_kernels()
+        
         print("✅ 初始化完成")
     
     async def _process_data(self, raw_data: bytes):
@@ -226,21 +228,6 @@ class SixAxis3DVisualizer:
         except Exception as e:
             logger.error(f"数据处理异常: {e}")
     
-    def _quaternion_to_rotation_matrix(self, q):
-        """四元数转旋转矩阵"""
-        # 归一化
-        norm = math.sqrt(q['w']**2 + q['x']**2 + q['y']**2 + q['z']**2)
-        if norm > 0:
-            w, x, y, z = q['w']/norm, q['x']/norm, q['y']/norm, q['z']/norm
-        else:
-            w, x, y, z = 1, 0, 0, 0
-        
-        return np.array([
-            [1-2*(y*y+z*z), 2*(x*y-w*z), 2*(x*z+w*y)],
-            [2*(x*y+w*z), 1-2*(x*x+z*z), 2*(y*z-w*x)],
-            [2*(x*z-w*y), 2*(y*z+w*x), 1-2*(x*x+y*y)]
-        ])
-    
     def _create_visualizer(self):
         """创建3D可视化器"""
         print("🖥️ 创建3D可视化器...")
@@ -296,11 +283,9 @@ class SixAxis3DVisualizer:
                 quat = self.current_quaternion.copy()
                 self.data_updated = False
             
-            # 转换为旋转矩阵
-            rotation_matrix = self._quaternion_to_rotation_matrix(quat)
-            
-            # 应用旋转
-            rotated_vertices = np.dot(self.original_vertices, rotation_matrix.T)
+            # 归一化 + 四元数夹积 v' = v + 2w(u×v) + 2u×(u×v) 旋转顶点，不构建旋转矩阵
+            self._quat[:] = (quat['w'], quat['x'], quat['y'], quat['z'])
+            rotated_vertices = rotate_vectors(self._quat, self.original_vertices, self._rotated_vertices)
             
             # 更新立方体
             self.sensor_mesh.vertices = o3d.utility.Vector3dVector(rotated_vertices)
@@ -272,13 +272,14 @@ class ComplementaryFilter:
             result.normalize()
             return result
         
-        # 球面插值
-        theta_0 = np.arccos(abs(dot))
-        sin_theta_0 = np.sin(theta_0)
+        # 球面插值 (0 <= theta <= theta_0 <= π/2，余弦和 sin(theta_0) 可由勾股关系开方得到)
+        theta_0 = math.acos(dot)
+        sin_theta_0 = math.sqrt(1.0 - dot * dot)
         theta = theta_0 * t
-        sin_theta = np.sin(theta)
+        sin_theta = math.sin(theta)
+        cos_theta = math.sqrt(1.0 - sin_theta * sin_theta)
         
-        s0 = np.cos(theta) - dot * sin_theta / sin_theta_0
+        s0 = cos_theta - dot * sin_theta / sin_theta_0
         s1 = sin_theta / sin_theta_0
         
         w = s0 * q1.w + s1 * q2.w
@@ -601,11 +602,18 @@ class ComplementaryFilter:
         # 归一化权重
         weights = weights / np.sum(weights)
         
-        # 加权平均
-        w = sum(q.w * w for q, w in zip(quats, weights))
-        x = sum(q.x * w for q, w in zip(quats, weights))
-        y = sum(q.y * w for q, w in zip(quats, weights))
-        z = sum(q.z * w for q, w in zip(quats, weights))
+        # 统一到最新四元数所在半球，q与-q表示同一旋转，直接相加会相互抵消
+        ref = quats[-1]
+        signs = [
+            -1.0 if q.w * ref.w + q.x * ref.x + q.y * ref.y + q.z * ref.z < 0.0 else 1.0
+            for q in quats
+        ]
+        
+        # 加权平均 (NLERP)
+        w = sum(q.w * s * w for q, s, w in zip(quats, signs, weights))
+        x = sum(q.x * s * w for q, s, w in zip(quats, signs, weights))
+        y = sum(q.y * s * w for q, s, w in zip(quats, signs, weights))
+        z = sum(q.z * s * w for q, s, w in zip(quats, signs, weights))
         
         result = Quaternion(w, x, y, z)
         result.normalize()
@@ -0,0 +1,42 @@
+"""
+绘图辅助函数
+与界面无关的抽稀和坐标轴范围计算，供时间轴绘图器使用
+"""
+
+import numpy as np
+
+
+def minmax_decimate(times, columns, n_bins):
+    """按块取最小/最大值抽稀 (示波器方式)，用约 2*n_bins 个点保留波形包络；
+    不足一块的末尾样本原样保留，点数不超过 2*n_bins 时不抽稀"""
+    if len(times) <= 2 * n_bins:
+        return [times, *columns]
+
+    stride = len(times) // n_bins
+    usable = stride * n_bins
+
+    t_blocks = times[:usable].reshape(n_bins, stride)
+    t_out = np.empty(2 * n_bins, dtype=times.dtype)
+    t_out[0::2] = t_blocks[:, 0]
+    t_out[1::2] = t_blocks[:, -1]
+    result = [np.concatenate((t_out, times[usable:]))]
+
+    for col in columns:
+        blocks = col[:usable].reshape(n_bins, stride)
+        out = np.empty(2 * n_bins, dtype=col.dtype)
+        out[0::2] = blocks.min(axis=1)
+        out[1::2] = blocks.max(axis=1)
+        result.append(np.concatenate((out, col[usable:])))
+    return result
+
+
+def hysteresis_limits(lo, hi, current, margin=0.1):
+    """坐标轴范围迟滞：所需范围 [lo, hi] 仍在当前范围内且当前范围没有超出太多时沿用当前范围，
+    否则两侧各留 margin 比例的余量重新设置，避免数据轻微波动就改动坐标轴并整图重绘；
+    收缩的容差取余量的两倍，刚设置的范围 (已含余量) 在数据略微收窄时不会立即缩小"""
+    cur_lo, cur_hi = current
+    span = hi - lo
+    if cur_lo <= lo and hi <= cur_hi and (cur_hi - cur_lo) - span <= 4 * margin * span + 1e-9:
+        return current
+    pad = margin * span
+    return (lo - pad, hi + pad)
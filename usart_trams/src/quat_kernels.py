@@ -0,0 +1,208 @@
+"""
+四元数计算内核
+将渲染热路径上的插值 (onlerp 近似 SLERP)、归一化和顶点/法线旋转融合为单个函数，
+并提供基于 [w, x, y, z] 数组的乘法、共轭、归一化和转矩阵内核，
+安装了 Numba 时自动 JIT 编译，否则以纯 Python 运行
+"""
+
+import math
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Numba 不可用时的空装饰器"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True, fastmath=True)
+def _onlerp(w0, x0, y0, z0, w1, x1, y1, z1, t):
+    """从 q0 向 q1 插值 t 并归一化，返回 (w, x, y, z)"""
+    # 计算点积，按符号翻转目标取较短路径 (copysign 无分支)
+    dot = w0*w1 + x0*x1 + y0*y1 + z0*z1
+    sign = math.copysign(1.0, dot)
+    w1 *= sign
+    x1 *= sign
+    y1 *= sign
+    z1 *= sign
+    dot *= sign
+
+    # onlerp: 用多项式修正插值参数逼近 SLERP (Zeux 2016)，
+    # 无需 acos/sin，归一化后与 SLERP 的误差在可视精度以下
+    A = 1.0904 + dot*(-3.2452 + dot*(3.55645 - dot*1.43519))
+    B = 0.848013 + dot*(-1.06021 + dot*0.215638)
+    k = A*(t - 0.5)*(t - 0.5) + B
+    s1 = t + t*(t - 0.5)*(t - 1.0)*k
+    s0 = 1.0 - s1
+
+    w = s0*w0 + s1*w1
+    x = s0*x0 + s1*x1
+    y = s0*y0 + s1*y1
+    z = s0*z0 + s1*z1
+
+    # 归一化
+    norm = math.sqrt(w*w + x*x + y*y + z*z)
+    if norm > 0.0:
+        inv = 1.0 / norm
+        w *= inv
+        x *= inv
+        y *= inv
+        z *= inv
+    return w, x, y, z
+
+
+@njit(cache=True, fastmath=True)
+def _rotate_unit(w, x, y, z, v_in, v_out):
+    """用单位四元数的夹积旋转 (N,3) 向量并写入 v_out"""
+    for i in range(v_in.shape[0]):
+        vx, vy, vz = v_in[i, 0], v_in[i, 1], v_in[i, 2]
+        # t = 2 * (u × v)，v' = v + w*t + u × t
+        tx = 2.0*(y*vz - z*vy)
+        ty = 2.0*(z*vx - x*vz)
+        tz = 2.0*(x*vy - y*vx)
+        v_out[i, 0] = vx + w*tx + (y*tz - z*ty)
+        v_out[i, 1] = vy + w*ty + (z*tx - x*tz)
+        v_out[i, 2] = vz + w*tz + (x*ty - y*tx)
+
+
+@njit(cache=True, fastmath=True)
+def smooth_rotate_step(prev, target, last, t, eps, verts_in, verts_out, normals_in, normals_out):
+    """单帧平滑渲染步骤：prev 向 target 插值 t 并原地写回，
+    与 last (上次渲染姿态) 相差超过 eps 时旋转顶点和法线并更新 last；
+    返回 (几何体是否更新, prev 是否已收敛到 target)"""
+    w0, x0, y0, z0 = prev[0], prev[1], prev[2], prev[3]
+    w1, x1, y1, z1 = target[0], target[1], target[2], target[3]
+
+    # 平滑姿态已与目标几乎重合 (如传感器静止) 时直接返回
+    if abs(w0*w1 + x0*x1 + y0*y1 + z0*z1) > 1.0 - eps:
+        return False, True
+
+    w, x, y, z = _onlerp(w0, x0, y0, z0, w1, x1, y1, z1, t)
+    prev[0] = w
+    prev[1] = x
+    prev[2] = y
+    prev[3] = z
+    converged = abs(w*w1 + x*x1 + y*y1 + z*z1) > 1.0 - eps
+
+    # 与上次渲染的姿态几乎相同时跳过；只在实际渲染时记录，避免微小变化逐帧累积却始终不渲染
+    if abs(w*last[0] + x*last[1] + y*last[2] + z*last[3]) > 1.0 - eps:
+        return False, converged
+    last[0] = w
+    last[1] = x
+    last[2] = y
+    last[3] = z
+
+    _rotate_unit(w, x, y, z, verts_in, verts_out)
+    _rotate_unit(w, x, y, z, normals_in, normals_out)
+    return True, converged
+
+
+@njit(cache=True, fastmath=True)
+def qmul(q1, q2, out):
+    """四元数乘法 q1 * q2，结果写入 out；数组均为 [w, x, y, z]"""
+    w1, x1, y1, z1 = q1[0], q1[1], q1[2], q1[3]
+    w2, x2, y2, z2 = q2[0], q2[1], q2[2], q2[3]
+    out[0] = w1*w2 - x1*x2 - y1*y2 - z1*z2
+    out[1] = w1*x2 + x1*w2 + y1*z2 - z1*y2
+    out[2] = w1*y2 - x1*z2 + y1*w2 + z1*x2
+    out[3] = w1*z2 + x1*y2 - y1*x2 + z1*w2
+    return out
+
+
+@njit(cache=True, fastmath=True)
+def qconj(q, out):
+    """四元数共轭，结果写入 out"""
+    out[0] = q[0]
+    out[1] = -q[1]
+    out[2] = -q[2]
+    out[3] = -q[3]
+    return out
+
+
+@njit(cache=True, fastmath=True)
+def qnormalize(q, out):
+    """四元数归一化，结果写入 out (零四元数原样复制)"""
+    norm = math.sqrt(q[0]*q[0] + q[1]*q[1] + q[2]*q[2] + q[3]*q[3])
+    inv = 1.0 / norm if norm > 0.0 else 1.0
+    for i in range(4):
+        out[i] = q[i] * inv
+    return out
+
+
+@njit(cache=True, fastmath=True)
+def q_to_matrix(q, out):
+    """四元数 (自动归一化) 转旋转矩阵，写入 3x3 的 out"""
+    w, x, y, z = q[0], q[1], q[2], q[3]
+    # 传感器输出通常已是单位四元数，模长平方足够接近1时跳过开方
+    norm_sq = w*w + x*x + y*y + z*z
+    if abs(norm_sq - 1.0) > 1e-6 and norm_sq > 0.0:
+        inv = 1.0 / math.sqrt(norm_sq)
+        w *= inv
+        x *= inv
+        y *= inv
+        z *= inv
+
+    xx, yy, zz = x*x, y*y, z*z
+    xy, xz, yz = x*y, x*z, y*z
+    wx, wy, wz = w*x, w*y, w*z
+
+    out[0, 0] = 1.0 - 2.0*(yy + zz)
+    out[0, 1] = 2.0*(xy - wz)
+    out[0, 2] = 2.0*(xz + wy)
+    out[1, 0] = 2.0*(xy + wz)
+    out[1, 1] = 1.0 - 2.0*(xx + zz)
+    out[1, 2] = 2.0*(yz - wx)
+    out[2, 0] = 2.0*(xz - wy)
+    out[2, 1] = 2.0*(yz + wx)
+    out[2, 2] = 1.0 - 2.0*(xx + yy)
+    return out
+
+
+@njit(cache=True, fastmath=True)
+def q_same_rotation(q0, q1, eps):
+    """两个单位四元数表示的旋转是否几乎相同 (1 - |q0·q1| < eps，对 q 与 -q 不敏感)"""
+    dot = q0[0]*q1[0] + q0[1]*q1[1] + q0[2]*q1[2] + q0[3]*q1[3]
+    return abs(dot) > 1.0 - eps
+
+
+@njit(cache=True, fastmath=True)
+def rotate_vectors(q, v_in, v_out):
+    """用夹积 q * v * q^-1 旋转 (N,3) 向量并写入 v_out，不构建旋转矩阵"""
+    w, x, y, z = q[0], q[1], q[2], q[3]
+    norm_sq = w*w + x*x + y*y + z*z
+    if abs(norm_sq - 1.0) > 1e-6 and norm_sq > 0.0:
+        inv = 1.0 / math.sqrt(norm_sq)
+        w *= inv
+        x *= inv
+        y *= inv
+        z *= inv
+
+    _rotate_unit(w, x, y, z, v_in, v_out)
+    return v_out
+
+
+def warmup():
+    """预先触发 JIT 编译，避免首帧卡顿"""
+    if NUMBA_AVAILABLE:
+        q = np.array([1.0, 0.0, 0.0, 0.0])
+        out = np.empty(4)
+        matrix = np.empty((3, 3))
+        smooth_rotate_step(q.copy(), np.array([0.0, 1.0, 0.0, 0.0]), np.zeros(4), 0.5, 1e-7,
+                           matrix, np.empty((3, 3)), matrix, np.empty((3, 3)))
+        qmul(q, q, out)
+        qconj(q, out)
+        qnormalize(q, out)
+        q_to_matrix(q, matrix)
+        q_same_rotation(q, q, 1e-7)
+        rotate_vectors(q, matrix, np.empty((3, 3)))
+        logger.info("Numba 四元数内核已编译")
@@ -5,13 +5,21 @@
 
 import struct
 import math
+import warnings
 import numpy as np
 from typing import List, Dict, Any, Optional, Tuple
-from collections import deque
 import logging
 
+from .ring_buffer import RingBuffer
+
 logger = logging.getLogger(__name__)
 
+# 预编译的结构体解析器，配合 unpack_from 直接按偏移解析，免去每帧切片分配
+_QUAT_F32_LE = struct.Struct('<ffff')
+_QUAT_F32_BE = struct.Struct('>ffff')
+_QUAT_F64_LE = struct.Struct('<dddd')
+_U16_LE = struct.Struct('<H')
+
 
 class Quaternion:
     """四元数类"""
@@ -51,12 +59,21 @@ class Quaternion:
         if norm > 0:
             w, x, y, z = w/norm, x/norm, y/norm, z/norm
         
-        # 计算旋转矩阵
-        matrix = np.array([
-            [1 - 2*(y**2 + z**2), 2*(x*y - w*z), 2*(x*z + w*y)],
-            [2*(x*y + w*z), 1 - 2*(x**2 + z**2), 2*(y*z - w*x)],
-            [2*(x*z - w*y), 2*(y*z + w*x), 1 - 2*(x**2 + y**2)]
-        ])
+        # 计算旋转矩阵 (二次项只算一次，直接写入预分配矩阵)
+        xx, yy, zz = x*x, y*y, z*z
+        xy, xz, yz = x*y, x*z, y*z
+        wx, wy, wz = w*x, w*y, w*z
+        
+        matrix = np.empty((3, 3))
+        matrix[0, 0] = 1 - 2*(yy + zz)
+        matrix[0, 1] = 2*(xy - wz)
+        matrix[0, 2] = 2*(xz + wy)
+        matrix[1, 0] = 2*(xy + wz)
+        matrix[1, 1] = 1 - 2*(xx + zz)
+        matrix[1, 2] = 2*(yz - wx)
+        matrix[2, 0] = 2*(xz - wy)
+        matrix[2, 1] = 2*(yz + wx)
+        matrix[2, 2] = 1 - 2*(xx + yy)
         
         return matrix
     
@@ -125,8 +142,9 @@ class QuaternionProcessor:
     
     def __init__(self, config):
         self.config = config
-        self.quaternion_history = deque(maxlen=1000)  # 保存历史四元数
-        self.euler_history = deque(maxlen=1000)       # 保存历史欧拉角
+        # 历史记录以数组行存储 (批量路径整批写入，不逐个创建对象)，读取时再构造 Quaternion
+        self.quaternion_history = RingBuffer(1000, 4, dtype=np.float64)  # [w, x, y, z]
+        self.euler_history = RingBuffer(1000, 3, dtype=np.float64)       # [roll, pitch, yaw] 弧度
         
         # 数据解析格式
         self.data_formats = {
@@ -152,6 +170,9 @@ class QuaternionProcessor:
         # ASCII数据缓冲区 - 用于处理不完整的行
         self.ascii_buffer = b''
 
+        # process_raw_data_latest 复用的输出缓冲区 [w, x, y, z]
+        self._latest_quaternion = np.array([1.0, 0.0, 0.0, 0.0])
+
         # 互补滤波器
         self.enable_filtering = config.processing.enable_filtering
         self.complementary_filter = None
@@ -208,7 +229,7 @@ class QuaternionProcessor:
                 processed_data.append(data_point)
                 
                 # 保存到历史记录（使用滤波后的数据）
-                self.quaternion_history.append(filtered_quat)
+                self.quaternion_history.append((filtered_quat.w, filtered_quat.x, filtered_quat.y, filtered_quat.z))
                 self.euler_history.append((roll, pitch, yaw))
                 
                 self.valid_packets += 1
@@ -217,9 +238,112 @@ class QuaternionProcessor:
             return processed_data
             
         except Exception as e:
-            logger.error(f"处理四元数数据时发生错误: {e}")
+            logger.error("处理四元数数据时发生错误: %s", e)
             return []
     
+    def process_raw_data_batch(self, raw_data: bytes) -> Tuple[np.ndarray, np.ndarray]:
+        """批量处理原始串口数据，返回 (N,4) 四元数 [w,x,y,z] 和 (N,3) 欧拉角 (度)"""
+        try:
+            if self.current_format == 'ascii':
+                q = self._parse_ascii_array(raw_data)
+            elif self.current_format in ('float32', 'float64', 'binary'):
+                q = self._parse_binary_array(raw_data)
+            else:
+                quaternions = self.data_formats[self.current_format](raw_data)
+                q = np.array([(quat.w, quat.x, quat.y, quat.z) for quat in quaternions],
+                             dtype=np.float64).reshape(-1, 4)
+            self.total_packets += len(q)
+            if len(q) == 0:
+                return np.empty((0, 4)), np.empty((0, 3))
+
+            norms = np.sqrt(np.einsum('ij,ij->i', q, q))
+
+            # 向量化验证：有限值且模长接近1
+            if self.validation_enabled:
+                valid = np.isfinite(q).all(axis=1) & (np.abs(norms - 1.0) <= self.max_quaternion_norm_deviation)
+                self.invalid_packets += int(len(q) - np.count_nonzero(valid))
+                q = q[valid]
+                norms = norms[valid]
+                if len(q) == 0:
+                    return np.empty((0, 4)), np.empty((0, 3))
+
+            # 归一化四元数
+            nonzero = norms > 0
+            q[nonzero] /= norms[nonzero, None]
+
+            # 互补滤波有状态，只能逐个样本处理
+            if self.complementary_filter:
+                for row in q:
+                    filtered = self.complementary_filter.filter_quaternion(Quaternion(*row))
+                    row[:] = (filtered.w, filtered.x, filtered.y, filtered.z)
+
+            # 向量化计算欧拉角
+            w, x, y, z = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+            euler = np.empty((len(q), 3))
+            euler[:, 0] = np.arctan2(2 * (w * x + y * z), 1 - 2 * (x * x + y * y))
+            euler[:, 1] = np.arcsin(np.clip(2 * (w * y - z * x), -1.0, 1.0))
+            euler[:, 2] = np.arctan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z))
+
+            # 保存到历史记录（使用滤波后的数据）
+            self.quaternion_history.extend(q)
+            self.euler_history.extend(euler)
+            self.valid_packets += len(q)
+
+            return q, np.degrees(euler)
+
+        except Exception as e:
+            logger.error("批量处理四元数数据时发生错误: %s", e)
+            return np.empty((0, 4)), np.empty((0, 3))
+    
+    def process_raw_data_latest(self, raw_data: bytes) -> Optional[np.ndarray]:
+        """只解析最新的一个有效四元数 (已归一化)
+        
+        返回内部复用的 [w, x, y, z] 数组，调用方需立即拷贝；没有有效数据时返回 None。
+        ASCII格式从缓冲区尾部向前逐行查找，较早的行直接丢弃，不计入统计和历史。
+        """
+        # 互补滤波需要连续样本，其他格式没有行结构，均走批量路径
+        if self.current_format != 'ascii' or self.complementary_filter:
+            quaternions, _ = self.process_raw_data_batch(raw_data)
+            if len(quaternions) == 0:
+                return None
+            self._latest_quaternion[:] = quaternions[-1]
+            return self._latest_quaternion
+
+        buffer = self.ascii_buffer + raw_data
+        end = max(buffer.rfind(b'\n'), buffer.rfind(b'\r'))
+        if end < 0:
+            self.ascii_buffer = buffer[-500:] if len(buffer) > 1000 else buffer
+            return None
+        self.ascii_buffer = buffer[end + 1:]
+
+        # 从最后一个完整行开始向前查找第一条有效数据
+        while end >= 0:
+            start = max(buffer.rfind(b'\n', 0, end), buffer.rfind(b'\r', 0, end)) + 1
+            parts = buffer[start:end].split(b',')
+            end = start - 1
+            if len(parts) < 4:
+                continue
+            try:
+                quat = Quaternion(float(parts[0]), float(parts[1]), float(parts[2]), float(parts[3]))
+            except ValueError:
+                continue
+
+            self.total_packets += 1
+            if self.validation_enabled and not self._validate_quaternion(quat):
+                self.invalid_packets += 1
+                continue
+
+            quat.normalize()
+            self.quaternion_history.append((quat.w, quat.x, quat.y, quat.z))
+            self.euler_history.append(quat.to_euler_angles())
+            self.valid_packets += 1
+
+            out = self._latest_quaternion
+            out[0], out[1], out[2], out[3] = quat.w, quat.x, quat.y, quat.z
+            return out
+
+        return None
+    
     def _parse_float32_quaternion(self, data: bytes) -> List[Quaternion]:
         """解析32位浮点数四元数 (w, x, y, z)"""
         quaternions = []
@@ -231,7 +355,7 @@ class QuaternionProcessor:
         for i in range(0, len(data) - 15, 16):
             try:
                 # 解包4个float32值 (小端序)
-                w, x, y, z = struct.unpack('<ffff', data[i:i+16])
+                w, x, y, z = _QUAT_F32_LE.unpack_from(data, i)
                 quaternions.append(Quaternion(w, x, y, z))
             except struct.error:
                 continue
@@ -249,7 +373,7 @@ class QuaternionProcessor:
         for i in range(0, len(data) - 31, 32):
             try:
                 # 解包4个float64值 (小端序)
-                w, x, y, z = struct.unpack('<dddd', data[i:i+32])
+                w, x, y, z = _QUAT_F64_LE.unpack_from(data, i)
                 quaternions.append(Quaternion(w, x, y, z))
             except struct.error:
                 continue
@@ -266,7 +390,7 @@ class QuaternionProcessor:
 
             # 解码缓冲区数据
             text = self.ascii_buffer.decode('ascii', errors='ignore')
-            logger.debug(f"缓冲区数据: {repr(text[:100])}")  # 调试信息
+            logger.debug("缓冲区数据: %r", text[:100])  # 调试信息
 
             # 分割行，保留最后一行（可能不完整）
             lines = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
@@ -280,7 +404,7 @@ class QuaternionProcessor:
                 if not line:
                     continue
 
-                logger.debug(f"处理第{line_num+1}行: {repr(line)}")
+                logger.debug("处理第%s行: %r", line_num+1, line)
 
                 # 解析逗号分隔的值
                 parts = line.split(',')
@@ -294,13 +418,13 @@ class QuaternionProcessor:
 
                         quat = Quaternion(w, x, y, z)
                         quaternions.append(quat)
-                        logger.debug(f"成功解析四元数: w={w:.4f}, x={x:.4f}, y={y:.4f}, z={z:.4f}")
+                        logger.debug("成功解析四元数: w=%.4f, x=%.4f, y=%.4f, z=%.4f", w, x, y, z)
 
                     except (ValueError, IndexError) as e:
-                        logger.warning(f"解析行失败 '{line}': {e}")
+                        logger.warning("解析行失败 '%s': %s", line, e)
                         continue
                 else:
-                    logger.warning(f"数据格式错误，期望4个值，得到{len(parts)}个: {line}")
+                    logger.warning("数据格式错误，期望4个值，得到%s个: %s", len(parts), line)
 
             # 保留不完整的行到缓冲区
             self.ascii_buffer = incomplete_line.encode('ascii', errors='ignore')
@@ -310,13 +434,74 @@ class QuaternionProcessor:
                 self.ascii_buffer = self.ascii_buffer[-500:]  # 保留后500字节
 
         except Exception as e:
-            logger.error(f"解析ASCII四元数数据失败: {e}")
+            logger.error("解析ASCII四元数数据失败: %s", e)
             # 清空缓冲区以防止错误累积
             self.ascii_buffer = b''
 
-        logger.debug(f"总共解析出 {len(quaternions)} 个四元数")
+        logger.debug("总共解析出 %s 个四元数", len(quaternions))
         return quaternions
 
+    def _parse_ascii_array(self, data: bytes) -> np.ndarray:
+        """向量化解析ASCII格式四元数 "w,x,y,z\n"，直接返回 (N,4) 数组"""
+        buffer = self.ascii_buffer + data
+
+        # 只处理到最后一个换行符，其余保留到下次
+        end = max(buffer.rfind(b'\n'), buffer.rfind(b'\r'))
+        if end < 0:
+            self.ascii_buffer = buffer[-500:] if len(buffer) > 1000 else buffer
+            return np.empty((0, 4))
+        self.ascii_buffer = buffer[end + 1:]
+
+        lines = [line for line in buffer[:end].replace(b'\r', b'\n').split(b'\n') if line.strip()]
+        if not lines:
+            return np.empty((0, 4))
+
+        # 快速路径：每行恰好4个值时整块一次解析
+        if all(line.count(b',') == 3 for line in lines):
+            try:
+                with warnings.catch_warnings():
+                    # 旧版NumPy遇到非法数值只发出警告并截断，统一转为异常走回退路径
+                    warnings.simplefilter('error', DeprecationWarning)
+                    values = np.fromstring(b','.join(lines).decode('ascii', errors='ignore'), sep=',')
+                if values.size == 4 * len(lines):
+                    return values.reshape(-1, 4)
+            except (ValueError, DeprecationWarning):
+                pass
+
+        # 回退：逐行解析，跳过格式错误的行
+        rows = []
+        for line in lines:
+            parts = line.split(b',')
+            if len(parts) < 4:
+                logger.warning("数据格式错误，期望4个值，得到%s个: %r", len(parts), line)
+                continue
+            try:
+                rows.append([float(part) for part in parts[:4]])
+            except ValueError as e:
+                logger.warning("解析行失败 %r: %s", line, e)
+        return np.array(rows, dtype=np.float64).reshape(-1, 4)
+
+    def _parse_binary_array(self, data: bytes) -> np.ndarray:
+        """向量化解析定长二进制四元数 (float32 / float64 / binary)，直接返回 (N,4) 数组"""
+        if self.current_format == 'float64':
+            n = len(data) // 32
+            return np.frombuffer(data, dtype='<f8', count=4 * n).reshape(n, 4).copy()
+
+        n = len(data) // 16
+        le = np.frombuffer(data, dtype='<f4', count=4 * n).reshape(n, 4).astype(np.float64)
+        if self.current_format == 'float32' or n == 0:
+            return le
+
+        # binary: 与 _parse_binary_quaternion 相同，逐块优先取模长合理的小端序解释，否则尝试大端序
+        be = np.frombuffer(data, dtype='>f4', count=4 * n).reshape(n, 4).astype(np.float64)
+        with np.errstate(over='ignore', invalid='ignore'):
+            mag_le = np.sqrt(np.einsum('ij,ij->i', le, le))
+            mag_be = np.sqrt(np.einsum('ij,ij->i', be, be))
+        ok_le = (mag_le >= 0.1) & (mag_le <= 2.0)
+        ok_be = (mag_be >= 0.1) & (mag_be <= 2.0)
+        q = np.where(ok_le[:, None], le, be)
+        return q[ok_le | ok_be]
+
     def _parse_binary_quaternion(self, data: bytes) -> List[Quaternion]:
         """解析二进制格式四元数数据"""
         quaternions = []
@@ -329,16 +514,14 @@ class QuaternionProcessor:
             quaternion_size = 16
 
             if len(data) < quaternion_size:
-                logger.debug(f"二进制数据不足，需要{quaternion_size}字节，实际{len(data)}字节")
+                logger.debug("二进制数据不足，需要%s字节，实际%s字节", quaternion_size, len(data))
                 return quaternions
 
             # 处理所有完整的四元数
             for i in range(0, len(data) - quaternion_size + 1, quaternion_size):
-                chunk = data[i:i + quaternion_size]
-
                 # 尝试小端序解析
                 try:
-                    values = struct.unpack('<ffff', chunk)  # 小端序
+                    values = _QUAT_F32_LE.unpack_from(data, i)  # 小端序
                     w, x, y, z = values
 
                     # 验证四元数合理性（模长应该接近1）
@@ -347,7 +530,7 @@ class QuaternionProcessor:
                     if 0.1 <= magnitude <= 2.0:  # 合理的四元数范围
                         quat = Quaternion(w, x, y, z)
                         quaternions.append(quat)
-                        logger.debug(f"解析二进制四元数: {quat}, 模长: {magnitude:.4f}")
+                        logger.debug("解析二进制四元数: %s, 模长: %.4f", quat, magnitude)
                         continue
 
                 except struct.error:
@@ -355,7 +538,7 @@ class QuaternionProcessor:
 
                 # 如果小端序失败，尝试大端序
                 try:
-                    values = struct.unpack('>ffff', chunk)  # 大端序
+                    values = _QUAT_F32_BE.unpack_from(data, i)  # 大端序
                     w, x, y, z = values
 
                     # 验证四元数合理性
@@ -364,7 +547,7 @@ class QuaternionProcessor:
                     if 0.1 <= magnitude <= 2.0:
                         quat = Quaternion(w, x, y, z)
                         quaternions.append(quat)
-                        logger.debug(f"解析二进制四元数(大端): {quat}, 模长: {magnitude:.4f}")
+                        logger.debug("解析二进制四元数(大端): %s, 模长: %.4f", quat, magnitude)
                         continue
 
                 except struct.error:
@@ -373,7 +556,7 @@ class QuaternionProcessor:
                 # 如果都失败，尝试其他可能的格式
                 # 可能是x,y,z,w的顺序
                 try:
-                    values = struct.unpack('<ffff', chunk)
+                    values = _QUAT_F32_LE.unpack_from(data, i)
                     x, y, z, w = values  # 不同的顺序
 
                     magnitude = math.sqrt(w*w + x*x + y*y + z*z)
@@ -381,18 +564,18 @@ class QuaternionProcessor:
                     if 0.1 <= magnitude <= 2.0:
                         quat = Quaternion(w, x, y, z)
                         quaternions.append(quat)
-                        logger.debug(f"解析二进制四元数(xyzw): {quat}, 模长: {magnitude:.4f}")
+                        logger.debug("解析二进制四元数(xyzw): %s, 模长: %.4f", quat, magnitude)
                         continue
 
                 except struct.error:
                     pass
 
-                logger.debug(f"无法解析二进制数据块: {chunk.hex()}")
+                logger.debug("无法解析二进制数据块: %s", data[i:i + quaternion_size].hex())
 
         except Exception as e:
-            logger.error(f"解析二进制四元数数据失败: {e}")
+            logger.error("解析二进制四元数数据失败: %s", e)
 
-        logger.debug(f"二进制格式解析出 {len(quaternions)} 个四元数")
+        logger.debug("二进制格式解析出 %s 个四元数", len(quaternions))
         return quaternions
 
     def _parse_custom_quaternion(self, data: bytes) -> List[Quaternion]:
@@ -408,15 +591,15 @@ class QuaternionProcessor:
         for i in range(0, len(data) - packet_size + 1, packet_size):
             try:
                 # 检查包头 (示例: 0xAA55)
-                header = struct.unpack('<H', data[i:i+2])[0]
+                header = _U16_LE.unpack_from(data, i)[0]
                 if header != 0xAA55:
                     continue
                 
                 # 解析四元数
-                w, x, y, z = struct.unpack('<ffff', data[i+2:i+18])
+                w, x, y, z = _QUAT_F32_LE.unpack_from(data, i + 2)
                 
                 # 检查校验和 (简单示例)
-                checksum = struct.unpack('<H', data[i+18:i+20])[0]
+                checksum = _U16_LE.unpack_from(data, i + 18)[0]
                 # 这里可以添加校验和验证逻辑
                 
                 quaternions.append(Quaternion(w, x, y, z))
@@ -435,7 +618,7 @@ class QuaternionProcessor:
         # 检查模长是否接近1 (允许一定偏差)
         norm = math.sqrt(quat.w**2 + quat.x**2 + quat.y**2 + quat.z**2)
         if abs(norm - 1.0) > self.max_quaternion_norm_deviation:
-            logger.debug(f"四元数模长偏差过大: {norm}")
+            logger.debug("四元数模长偏差过大: %s", norm)
             return False
         
         return True
@@ -447,19 +630,23 @@ class QuaternionProcessor:
     
     def get_latest_quaternion(self) -> Optional[Quaternion]:
         """获取最新的四元数"""
-        return self.quaternion_history[-1] if self.quaternion_history else None
+        if not len(self.quaternion_history):
+            return None
+        return Quaternion(*self.quaternion_history.view()[-1].tolist())
     
     def get_latest_euler_angles(self) -> Optional[Tuple[float, float, float]]:
         """获取最新的欧拉角"""
-        return self.euler_history[-1] if self.euler_history else None
+        if not len(self.euler_history):
+            return None
+        return tuple(self.euler_history.view()[-1].tolist())
     
     def get_quaternion_history(self, count: int = 100) -> List[Quaternion]:
         """获取四元数历史记录"""
-        return list(self.quaternion_history)[-count:]
+        return [Quaternion(*row) for row in self.quaternion_history.view()[-count:].tolist()]
     
     def get_euler_history(self, count: int = 100) -> List[Tuple[float, float, float]]:
         """获取欧拉角历史记录"""
-        return list(self.euler_history)[-count:]
+        return [tuple(row) for row in self.euler_history.view()[-count:].tolist()]
     
     def get_statistics(self) -> Dict[str, Any]:
         """获取处理统计信息"""
@@ -478,9 +665,9 @@ class QuaternionProcessor:
         """设置数据解析格式"""
         if format_name in self.data_formats:
             self.current_format = format_name
-            logger.info(f"数据格式已设置为: {format_name}")
+            logger.info("数据格式已设置为: %s", format_name)
         else:
-            logger.error(f"不支持的数据格式: {format_name}")
+            logger.error("不支持的数据格式: %s", format_name)
     
     def clear_history(self):
         """清空历史记录"""
@@ -0,0 +1,191 @@
+"""
+NumPy 环形缓冲区
+固定容量、预分配的二维缓冲区，写入时不扩容、不重新分配，
+读取时通过 view() 得到按写入顺序排列的连续数组 (参考 DvG_RingBuffer 的展开方式)；
+SharedRingBuffer 将同样的布局放在共享内存中，用于跨进程传递数据
+"""
+
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class RingBuffer:
+    """固定容量的环形缓冲区，每行一个样本，写满后覆盖最旧的数据
+    columns 为 None 时每行是单个元素 (如结构化记录)，否则为 columns 列的一行"""
+
+    def __init__(self, capacity: int, columns=None, dtype=np.float32):
+        self.capacity = capacity
+        shape = (capacity,) if columns is None else (capacity, columns)
+        self._buf = np.zeros(shape, dtype=dtype)
+        self._unwrap = np.empty_like(self._buf)  # 跨越回绕点时的展开缓冲区
+        self._head = 0  # 下一次写入的位置
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def clear(self):
+        """清空缓冲区 (不释放内存)"""
+        self._head = 0
+        self._size = 0
+
+    def append(self, row):
+        """写入一行"""
+        self._buf[self._head] = row
+        self._head = (self._head + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def extend(self, rows: np.ndarray):
+        """批量写入 N 行；超过容量时只保留最新的 capacity 行"""
+        n = len(rows)
+        if n == 0:
+            return
+        if n >= self.capacity:
+            self._buf[:] = rows[-self.capacity:]
+            self._head = 0
+            self._size = self.capacity
+            return
+
+        end = self._head + n
+        if end <= self.capacity:
+            self._buf[self._head:end] = rows
+        else:
+            # 跨越回绕点时分两段写入
+            first = self.capacity - self._head
+            self._buf[self._head:] = rows[:first]
+            self._buf[:n - first] = rows[first:]
+        self._head = end % self.capacity
+        self._size = min(self._size + n, self.capacity)
+
+    def view(self) -> np.ndarray:
+        """按写入顺序返回全部有效行；未回绕时为零拷贝视图，回绕后展开到内部缓冲区"""
+        if self._size < self.capacity:
+            return self._buf[:self._size]
+        head = self._head
+        if head == 0:
+            return self._buf
+        tail = self.capacity - head
+        np.copyto(self._unwrap[:tail], self._buf[head:])
+        np.copyto(self._unwrap[tail:], self._buf[:head])
+        return self._unwrap
+
+
+class SharedRingBuffer(RingBuffer):
+    """位于 multiprocessing.shared_memory 中的环形缓冲区，供采集子进程写入、GUI进程读取 (单写单读)
+    共享内存头部只保存两个计数：written 为已写完的累计行数，reserved 为正在写入的目标行数；
+    写入方先增加 reserved、再写数据、最后发布 written，读取方复制前后分别读取这两个计数，
+    即可判断复制期间哪些最旧的行被覆盖并将其丢弃，两个进程之间无需加锁"""
+
+    _HEADER_BYTES = 16  # int64[2]: written, reserved
+
+    def __init__(self, capacity: int, columns=None, dtype=np.float32, name: str = None):
+        dtype = np.dtype(dtype)
+        shape = (capacity,) if columns is None else (capacity, columns)
+        nbytes = self._HEADER_BYTES + int(np.prod(shape)) * dtype.itemsize
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+        self.capacity = capacity
+        self._columns = columns
+        self._header = np.ndarray((2,), dtype=np.int64, buffer=self.shm.buf)
+        self._buf = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=self._HEADER_BYTES)
+        self._unwrap = np.empty(shape, dtype=dtype)  # 展开缓冲区为进程私有
+        if name is None:
+            self._header[:] = 0
+
+    @property
+    def _written(self) -> int:
+        return int(self._header[0])
+
+    @property
+    def _reserved(self) -> int:
+        return int(self._header[1])
+
+    @property
+    def _head(self) -> int:
+        return self._written % self.capacity
+
+    @property
+    def _size(self) -> int:
+        return min(self._written, self.capacity)
+
+    def clear(self):
+        """清空缓冲区 (只由写入方调用)；先撤销 reserved，正在复制的读取方会发现计数回退而重读"""
+        self._header[1] = 0
+        self._header[0] = 0
+
+    def append(self, row):
+        """写入一行"""
+        written = self._written
+        self._header[1] = written + 1
+        self._buf[written % self.capacity] = row
+        self._header[0] = written + 1
+
+    def extend(self, rows: np.ndarray):
+        """批量写入 N 行；超过容量时只写入最新的 capacity 行"""
+        n = len(rows)
+        if n == 0:
+            return
+        written = self._written
+        self._header[1] = written + n
+
+        m = min(n, self.capacity)
+        start = (written + n - m) % self.capacity
+        first = min(m, self.capacity - start)
+        self._buf[start:start + first] = rows[n - m:n - m + first]
+        if first < m:
+            self._buf[:m - first] = rows[n - m + first:]
+        self._header[0] = written + n
+
+    def view(self) -> np.ndarray:
+        """按写入顺序返回一致的快照
+        未回绕时为零拷贝视图 (写入方只在其后追加，已有的行要等回绕时才会被覆盖)；
+        回绕后复制到进程私有的展开缓冲区，并丢弃复制期间被写入方覆盖的最旧行"""
+        while True:
+            written = self._written
+            size = min(written, self.capacity)
+            if written <= self.capacity:
+                reserved = self._reserved
+                if reserved < written:
+                    continue  # 读取期间被清空
+                if reserved <= self.capacity:
+                    return self._buf[:size]
+                # 写入方已开始回绕，改为复制
+
+            oldest = written - size  # 快照中第一行的累计序号
+            start = oldest % self.capacity
+            tail = min(size, self.capacity - start)
+            np.copyto(self._unwrap[:tail], self._buf[start:start + tail])
+            np.copyto(self._unwrap[tail:size], self._buf[:size - tail])
+
+            reserved = self._reserved
+            if reserved < written:
+                continue  # 读取期间被清空
+            # 累计序号小于 reserved - capacity 的行已被 (或正在被) 覆盖
+            dropped = max(0, reserved - self.capacity - oldest)
+            if dropped < size or size == 0:
+                return self._unwrap[dropped:size]
+
+    @property
+    def spec(self) -> tuple:
+        """在其他进程中重新打开本缓冲区所需的参数 (可 pickle)"""
+        return self.shm.name, self.capacity, self._columns, self._buf.dtype
+
+    @classmethod
+    def attach(cls, spec: tuple) -> "SharedRingBuffer":
+        """按 spec 打开已存在的共享缓冲区"""
+        name, capacity, columns, dtype = spec
+        return cls(capacity, columns, dtype, name=name)
+
+    def close(self):
+        """解除本进程的映射 (需先释放指向共享内存的数组)"""
+        del self._header, self._buf
+        self.shm.close()
+
+    def unlink(self):
+        """销毁共享内存 (由创建方在所有进程关闭后调用)"""
+        self.shm.unlink()
@@ -5,6 +5,7 @@
 
 import asyncio
 import logging
+import os
 import time
 from typing import Callable, Optional, List
 import serial
@@ -25,6 +26,8 @@ class SerialManager:
         self.serial_port: Optional[serial.Serial] = None
         self.running = False
         self.executor = ThreadPoolExecutor(max_workers=2)
+        # 同步回调专用单线程：解析等CPU工作不占用事件循环，且保持数据顺序
+        self.callback_executor = ThreadPoolExecutor(max_workers=1)
         
         # 性能统计
         self.bytes_received = 0
@@ -35,6 +38,9 @@ class SerialManager:
         # 数据缓冲
         self.read_buffer = bytearray()
         self.buffer_lock = asyncio.Lock()
+        
+        # 接收/处理/统计任务句柄，stop() 时取消
+        self._tasks: List[asyncio.Task] = []
     
     @staticmethod
     def list_available_ports() -> List[str]:
@@ -55,14 +61,14 @@ class SerialManager:
             )
             
             if self.serial_port and self.serial_port.is_open:
-                logger.info(f"串口连接成功: {self.config.serial.port}")
+                logger.info("串口连接成功: %s", self.config.serial.port)
                 return True
             else:
                 logger.error("串口连接失败")
                 return False
                 
         except Exception as e:
-            logger.error(f"串口连接异常: {e}")
+            logger.error("串口连接异常: %s", e)
             return False
     
     def _create_serial_connection(self) -> serial.Serial:
@@ -90,7 +96,7 @@ class SerialManager:
                 )
                 logger.info("串口已断开")
             except Exception as e:
-                logger.error(f"断开串口时发生错误: {e}")
+                logger.error("断开串口时发生错误: %s", e)
     
     async def start(self):
         """启动串口数据接收"""
@@ -102,54 +108,111 @@ class SerialManager:
         
         try:
             # 启动数据接收任务
-            receive_task = asyncio.create_task(self._receive_data())
-            process_task = asyncio.create_task(self._process_buffer())
-            stats_task = asyncio.create_task(self._update_statistics())
+            self._tasks = [
+                asyncio.create_task(self._receive_data()),
+                asyncio.create_task(self._process_buffer()),
+                asyncio.create_task(self._update_statistics())
+            ]
             
-            await asyncio.gather(
-                receive_task,
-                process_task,
-                stats_task,
-                return_exceptions=True
-            )
+            await asyncio.gather(*self._tasks, return_exceptions=True)
             
         except Exception as e:
-            logger.error(f"串口数据接收异常: {e}")
+            logger.error("串口数据接收异常: %s", e)
         finally:
             await self.disconnect()
     
     async def stop(self):
         """停止串口数据接收"""
         self.running = False
+        
+        # 取消接收任务；任务属于其他线程的事件循环时通过线程安全方式取消
+        loop = asyncio.get_running_loop()
+        local_tasks = []
+        for task in self._tasks:
+            if task.get_loop() is loop:
+                task.cancel()
+                local_tasks.append(task)
+            else:
+                task.get_loop().call_soon_threadsafe(task.cancel)
+        await asyncio.gather(*local_tasks, return_exceptions=True)
+        self._tasks = []
+        
         await self.disconnect()
         self.executor.shutdown(wait=True)
+        self.callback_executor.shutdown(wait=True)
     
     async def _receive_data(self):
         """异步接收串口数据"""
         loop = asyncio.get_event_loop()
         
+        # POSIX 上直接由事件循环监听串口文件描述符，数据到达才读取
+        if os.name == 'posix' and hasattr(self.serial_port, 'fileno'):
+            try:
+                await self._receive_data_fd(loop)
+                return
+            except NotImplementedError:
+                logger.debug("事件循环不支持 add_reader，回退到阻塞读取线程")
+        
+        # 其他平台 (如 Windows) 由线程池中的常驻线程阻塞读取，避免逐次轮询的唤醒延迟
+        await loop.run_in_executor(self.executor, self._blocking_read_loop, loop)
+    
+    def _blocking_read_loop(self, loop):
+        """阻塞读取串口数据并投递给事件循环（在线程池中常驻执行）"""
         while self.running and self.serial_port and self.serial_port.is_open:
             try:
-                # 在线程池中读取数据
-                data = await loop.run_in_executor(
-                    self.executor,
-                    self._read_serial_data
+                # 有积压时一次读完，否则阻塞等待至少1字节 (受串口超时约束，便于及时退出)
+                max_read = min(
+                    max(self.serial_port.in_waiting, 1),
+                    self.config.processing.buffer_size
                 )
+                data = self.serial_port.read(max_read)
                 
                 if data:
-                    async with self.buffer_lock:
-                        self.read_buffer.extend(data)
-                        self.bytes_received += len(data)
-                
-                # 最小休眠，最大响应速度
-                await asyncio.sleep(0.0001)  # 极高响应速度
-                
+                    self._log_received(data)
+                    loop.call_soon_threadsafe(self._append_received, data)
+            
             except Exception as e:
-                logger.error(f"接收数据时发生错误: {e}")
-                await asyncio.sleep(0.1)
+                if not self.running:
+                    break
+                logger.error("接收数据时发生错误: %s", e)
+                time.sleep(0.1)
+    
+    def _append_received(self, data: bytes):
+        """在事件循环线程中追加接收数据 (持锁的协程段内没有 await，不会与此交错)"""
+        self.read_buffer.extend(data)
+        self.bytes_received += len(data)
+    
+    async def _receive_data_fd(self, loop):
+        """基于文件描述符可读事件接收串口数据 (POSIX)"""
+        fd = self.serial_port.fileno()
+        readable = asyncio.Event()
+        loop.add_reader(fd, readable.set)
+        
+        try:
+            while self.running and self.serial_port and self.serial_port.is_open:
+                try:
+                    await readable.wait()
+                    readable.clear()
+                    
+                    # 已就绪的数据直接读取，不会阻塞事件循环
+                    data = self._read_serial_data()
+                    
+                    if data:
+                        async with self.buffer_lock:
+                            self.read_buffer.extend(data)
+                            self.bytes_received += len(data)
+                    else:
+                        # 可读但无数据 (如设备挂断)，短暂让出避免空转
+                        await asyncio.sleep(0.01)
+                
+                except Exception as e:
+                    logger.error("接收数据时发生错误: %s", e)
+                    await asyncio.sleep(0.1)
+        finally:
+            loop.remove_reader(fd)
     
     def _read_serial_data(self) -> bytes:
-        """读取串口数据（在线程池中执行）"""
+        """读取已就绪的串口数据（由文件描述符可读事件触发）"""
         if self.serial_port and self.serial_port.is_open:
             try:
                 # 检查是否有数据可读
@@ -160,22 +223,26 @@ class SerialManager:
                         self.config.processing.buffer_size
                     )
                     data = self.serial_port.read(max_read)
-
-                    # 调试信息：显示接收到的原始数据
                     if data:
-                        logger.debug(f"接收到 {len(data)} 字节数据: {data[:100]}...")  # 只显示前100字节
-                        try:
-                            # 尝试解码为文本以便调试
-                            text_preview = data.decode('ascii', errors='ignore')[:50]
-                            logger.debug(f"数据预览: {repr(text_preview)}")
-                        except:
-                            pass
+                        self._log_received(data)
 
                     return data
             except Exception as e:
-                logger.error(f"读取串口数据失败: {e}")
+                logger.error("读取串口数据失败: %s", e)
         return b''
     
+    @staticmethod
+    def _log_received(data: bytes):
+        """调试信息：显示接收到的原始数据 (仅在调试级别开启时解码)"""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("接收到 %s 字节数据: %s...", len(data), data[:100])  # 只显示前100字节
+            try:
+                # 尝试解码为文本以便调试
+                text_preview = data.decode('ascii', errors='ignore')[:50]
+                logger.debug("数据预览: %r", text_preview)
+            except Exception:
+                pass
+    
     async def _process_buffer(self):
         """处理缓冲区数据"""
         while self.running:
@@ -225,7 +292,7 @@ class SerialManager:
                 await asyncio.sleep(self.config.processing.processing_interval)
 
             except Exception as e:
-                logger.error(f"处理缓冲区数据时发生错误: {e}")
+                logger.error("处理缓冲区数据时发生错误: %s", e)
                 await asyncio.sleep(0.1)
     
     async def _call_data_callback(self, data: bytes):
@@ -234,15 +301,15 @@ class SerialManager:
             if asyncio.iscoroutinefunction(self.data_callback):
                 await self.data_callback(data)
             else:
-                # 在线程池中执行同步回调
+                # 在专用线程中执行同步回调
                 loop = asyncio.get_event_loop()
                 await loop.run_in_executor(
-                    self.executor,
+                    self.callback_executor,
                     self.data_callback,
                     data
                 )
         except Exception as e:
-            logger.error(f"数据回调函数执行失败: {e}")
+            logger.error("数据回调函数执行失败: %s", e)
     
     async def _update_statistics(self):
         """更新性能统计"""
@@ -267,7 +334,7 @@ class SerialManager:
                 await asyncio.sleep(1.0)
                 
             except Exception as e:
-                logger.error(f"更新统计信息时发生错误: {e}")
+                logger.error("更新统计信息时发生错误: %s", e)
                 await asyncio.sleep(1.0)
     
     async def send_data(self, data: bytes) -> bool:
@@ -290,11 +357,11 @@ class SerialManager:
                 self.serial_port.flush
             )
             
-            logger.debug(f"发送数据成功: {bytes_written} bytes")
+            logger.debug("发送数据成功: %s bytes", bytes_written)
             return True
             
         except Exception as e:
-            logger.error(f"发送数据失败: {e}")
+            logger.error("发送数据失败: %s", e)
             return False
     
     def get_statistics(self) -> dict:
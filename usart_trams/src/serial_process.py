@@ -0,0 +1,145 @@
+"""
+独立进程串口采集
+在子进程中运行串口接收和四元数解析，结果以 (t, [w, x, y, z]) 记录写入共享内存环形缓冲区，
+GUI进程只读取共享内存，高波特率下解析不再与绘图争用 GIL
+
+四元数分量按 Q1.15 定点数 (int16，分辨率 1/32767) 存储，
+单位四元数的取值范围 [-1, 1] 内精度远高于传感器精度，历史数据占用减少约一半
+"""
+
+import asyncio
+import logging
+import multiprocessing as mp
+import threading
+import time
+
+import numpy as np
+
+from .config import Config
+from .ring_buffer import SharedRingBuffer
+
+logger = logging.getLogger(__name__)
+
+# 历史数据记录：相对时间 (秒) + Q1.15 定点四元数 [w, x, y, z]
+HISTORY_DTYPE = np.dtype([('t', np.float32), ('q', np.int16, 4)])
+Q_SCALE = 32767
+
+# 相邻两批数据间隔超过该值 (秒) 时视为数据中断，不用于估计采样间隔
+MAX_BATCH_GAP = 0.5
+
+
+def serial_worker(config: Config, history_spec: tuple, start_time, data_count, stop_event, clear_event,
+                  log_level: int = logging.INFO):
+    """子进程入口：接收并解析串口数据，直到 stop_event 被置位或串口连接结束；
+    共享缓冲区只由本进程写入，GUI进程的清空请求通过 clear_event 交给本进程执行"""
+    # spawn 启动的子进程不继承父进程的日志配置，按父进程的级别重新配置 (fork 时已配置则无影响)
+    logging.basicConfig(level=log_level)
+
+    # 在子进程内导入，spawn 启动时只加载采集所需的模块
+    from .serial_manager import SerialManager
+    from .quaternion_processor import QuaternionProcessor
+
+    history = SharedRingBuffer.attach(history_spec)
+    processor = QuaternionProcessor(config)
+    processor.set_data_format(config.processing.data_format)
+
+    last_time = None        # 上一批最后一个样本的相对时间
+    sample_interval = 0.0   # 由相邻批次估计的采样间隔
+    write_lock = threading.Lock()  # 回调线程的写入与事件循环中的清空互斥
+
+    def apply_pending_clear():
+        """执行GUI进程请求的清空 (调用方持有 write_lock)"""
+        nonlocal last_time
+        if clear_event.is_set():
+            clear_event.clear()
+            history.clear()
+            start_time.value = time.time()
+            data_count.value = 0
+            last_time = None
+
+    def process_data(raw_data: bytes):
+        """解析一批数据并整批写入共享环形缓冲区"""
+        nonlocal last_time, sample_interval
+        try:
+            quaternions, _ = processor.process_raw_data_batch(raw_data)
+            count = len(quaternions)
+
+            with write_lock:
+                apply_pending_clear()
+                if not count:
+                    return
+
+                # 同一批的样本按采样间隔向前均匀分布，以批次到达时间为最后一个样本的时间
+                now = time.time() - start_time.value
+                if last_time is not None and 0.0 < now - last_time < MAX_BATCH_GAP:
+                    sample_interval = (now - last_time) / count
+                timestamps = now - (count - 1 - np.arange(count)) * sample_interval
+                if last_time is not None and last_time < now:
+                    np.maximum(timestamps, last_time, out=timestamps)  # 保持时间单调递增
+                last_time = now
+
+                rows = np.empty(count, dtype=HISTORY_DTYPE)
+                rows['t'] = timestamps
+                # 已归一化，各分量在 [-1, 1] 内，量化后不会溢出
+                np.rint(quaternions * Q_SCALE, out=rows['q'], casting='unsafe')
+                history.extend(rows)
+                data_count.value += count
+
+        except Exception as e:
+            logger.error("处理数据异常: %s", e)
+
+    serial_manager = SerialManager(config, process_data)
+
+    async def run():
+        serial_task = asyncio.create_task(serial_manager.start())
+        while not stop_event.is_set() and not serial_task.done():
+            # 没有新数据时也及时响应清空请求
+            with write_lock:
+                apply_pending_clear()
+            await asyncio.sleep(0.05)
+        await serial_manager.stop()
+        await asyncio.gather(serial_task, return_exceptions=True)
+        with write_lock:
+            apply_pending_clear()  # 退出前仍未执行的清空请求
+
+    try:
+        asyncio.run(run())
+    except Exception as e:
+        logger.error("串口采集进程异常: %s", e)
+    finally:
+        history.close()
+
+
+class SerialProcess:
+    """串口采集子进程的句柄
+    history 由调用方创建并持有；start_time / data_count 为共享的 mp.RawValue"""
+
+    def __init__(self, config: Config, history: SharedRingBuffer, start_time, data_count):
+        self._stop_event = mp.Event()
+        self._clear_event = mp.Event()
+        self._process = mp.Process(
+            target=serial_worker,
+            args=(config, history.spec, start_time, data_count, self._stop_event, self._clear_event,
+                  logging.getLogger().getEffectiveLevel()),
+            daemon=True
+        )
+
+    def start(self):
+        """启动采集子进程"""
+        self._process.start()
+
+    def is_alive(self) -> bool:
+        return self._process.is_alive()
+
+    def request_clear(self):
+        """请求子进程清空共享缓冲区并重新计时 (由唯一的写入方执行，避免两个进程同时改写)"""
+        self._clear_event.set()
+
+    def stop(self, timeout: float = 2.0):
+        """通知子进程停止并等待其退出，超时后强制结束"""
+        self._stop_event.set()
+        self._process.join(timeout)
+        if self._process.is_alive():
+            logger.warning("串口采集进程未在 %.1f 秒内退出，强制结束", timeout)
+            self._process.terminate()
+            self._process.join()
@@ -0,0 +1,94 @@
+"""
+绘图辅助函数测试：最小/最大值抽稀和坐标轴范围迟滞
+"""
+
+import unittest
+
+import numpy as np
+
+from src.plot_helpers import hysteresis_limits, minmax_decimate
+
+
+class TestMinmaxDecimate(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.times = np.cumsum(rng.uniform(0.001, 0.01, size=1003)).astype(np.float32)
+        self.values = rng.integers(-32767, 32768, size=1003).astype(np.int16)
+
+    def test_fewer_points_than_bins_unchanged(self):
+        for n in (0, 5, 20):
+            times, values = minmax_decimate(self.times[:n], (self.values[:n],), n_bins=10)
+            np.testing.assert_array_equal(times, self.times[:n])
+            np.testing.assert_array_equal(values, self.values[:n])
+
+    def test_odd_tail_kept_verbatim(self):
+        n_bins = 10  # 1003 = 10 * 100 + 3
+        times, values = minmax_decimate(self.times, (self.values,), n_bins)
+        self.assertEqual(len(times), 2 * n_bins + 3)
+        self.assertEqual(len(values), len(times))
+        np.testing.assert_array_equal(times[-3:], self.times[-3:])
+        np.testing.assert_array_equal(values[-3:], self.values[-3:])
+        self.assertEqual(values.dtype, self.values.dtype)
+
+    def test_blocks_keep_envelope(self):
+        n_bins = 7  # 1003 = 7 * 143 + 2
+        stride = len(self.times) // n_bins
+        times, w, x = minmax_decimate(self.times, (self.values, -self.values), n_bins)
+        for i in range(n_bins):
+            block = slice(i * stride, (i + 1) * stride)
+            self.assertEqual(times[2 * i], self.times[block][0])
+            self.assertEqual(times[2 * i + 1], self.times[block][-1])
+            self.assertEqual(w[2 * i], self.values[block].min())
+            self.assertEqual(w[2 * i + 1], self.values[block].max())
+            self.assertEqual(x[2 * i + 1], (-self.values[block]).max())
+        # 全局极值不变，时间仍单调不减
+        self.assertEqual(w.min(), self.values.min())
+        self.assertEqual(w.max(), self.values.max())
+        self.assertTrue(np.all(np.diff(times) >= 0))
+
+    def test_exact_multiple_has_no_tail(self):
+        times, values = minmax_decimate(self.times[:1000], (self.values[:1000],), 100)
+        self.assertEqual(len(times), 200)
+        self.assertEqual(values.max(), self.values[:1000].max())
+
+
+class TestHysteresisLimits(unittest.TestCase):
+
+    def test_initial_limits_padded(self):
+        lo, hi = hysteresis_limits(-1.0, 1.0, (0.0, 1.0))
+        self.assertAlmostEqual(lo, -1.2)
+        self.assertAlmostEqual(hi, 1.2)
+
+    def test_grows_when_data_leaves_range(self):
+        current = (-1.2, 1.2)
+        lo, hi = hysteresis_limits(-1.0, 1.5, current)
+        self.assertLessEqual(lo, -1.0)
+        self.assertGreaterEqual(hi, 1.5)
+        self.assertGreater(hi, current[1])
+
+    def test_never_shrinks_within_band(self):
+        current = hysteresis_limits(-1.0, 1.0, (0.0, 0.0))
+        # 数据范围小幅收窄时保持不变
+        for lo, hi in ((-1.0, 1.0), (-0.9, 1.0), (-0.95, 0.9), (-0.9, 0.9)):
+            with self.subTest(lo=lo, hi=hi):
+                self.assertEqual(hysteresis_limits(lo, hi, current), current)
+
+    def test_shrinks_outside_band(self):
+        current = hysteresis_limits(-1.0, 1.0, (0.0, 0.0))
+        lo, hi = hysteresis_limits(-0.2, 0.2, current)
+        self.assertGreater(lo, current[0])
+        self.assertLess(hi, current[1])
+        self.assertAlmostEqual(lo, -0.24)
+        self.assertAlmostEqual(hi, 0.24)
+
+    def test_stable_under_jitter(self):
+        rng = np.random.default_rng(5)
+        current = hysteresis_limits(-1.0, 1.0, (0.0, 0.0))
+        for _ in range(200):
+            lo, hi = -1.0 + rng.uniform(0, 0.1), 1.0 - rng.uniform(0, 0.1)
+            self.assertEqual(hysteresis_limits(lo, hi, current), current)
+
+
+if __name__ == '__main__':
+    unittest.main()
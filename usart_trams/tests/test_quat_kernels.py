@@ -0,0 +1,226 @@
+"""
+quat_kernels 数值测试：与 SLERP / 旋转矩阵参考实现比较 (安装了 SciPy 时同时与 scipy.spatial.transform 比较)
+NUMBA_AVAILABLE 时额外在 NUMBA_DISABLE_JIT=1 的子进程中重跑，覆盖纯 Python 路径
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+import numpy as np
+
+from src import quat_kernels as qk
+
+try:
+    from scipy.spatial.transform import Rotation, Slerp
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+# onlerp 相对 SLERP 的最大角度误差约 8e-4 弧度 (约 0.04°)
+ONLERP_TOL = 1e-3
+
+
+def _random_unit(rng, n=None):
+    q = rng.normal(size=(4,) if n is None else (n, 4))
+    return q / np.linalg.norm(q, axis=-1, keepdims=True)
+
+
+def _slerp(q0, q1, t):
+    """参考实现：沿较短路径的 SLERP"""
+    dot = q0 @ q1
+    if dot < 0.0:
+        q1, dot = -q1, -dot
+    theta = np.arccos(min(dot, 1.0))
+    if theta < 1e-12:
+        return q0.copy()
+    return (np.sin((1.0 - t) * theta) * q0 + np.sin(t * theta) * q1) / np.sin(theta)
+
+
+def _angle(q0, q1):
+    """两个单位四元数所表示旋转之间的夹角 (弧度)"""
+    return 2.0 * np.arccos(min(abs(q0 @ q1), 1.0))
+
+
+def _to_scipy(q):
+    """[w, x, y, z] -> SciPy 的 [x, y, z, w]"""
+    return np.roll(q, -1, axis=-1)
+
+
+def _step(prev, target, t, eps=1e-10, verts=None):
+    """调用 smooth_rotate_step，返回 (changed, converged, 旋转后的顶点)"""
+    verts = np.eye(3) if verts is None else verts
+    verts_out = np.empty_like(verts)
+    normals_out = np.empty_like(verts)
+    last = np.zeros(4)
+    changed, converged = qk.smooth_rotate_step(prev, target, last, t, eps,
+                                               verts, verts_out, verts, normals_out)
+    return changed, converged, verts_out
+
+
+class TestInterpolation(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(42)
+
+    def test_onlerp_close_to_slerp(self):
+        for _ in range(2000):
+            q0, q1 = _random_unit(self.rng), _random_unit(self.rng)
+            t = self.rng.random()
+            result = np.array(qk._onlerp(*q0, *q1, t))
+            self.assertAlmostEqual(np.linalg.norm(result), 1.0, places=12)
+            self.assertLess(_angle(result, _slerp(q0, q1, t)), ONLERP_TOL)
+
+    def test_onlerp_endpoints(self):
+        q0, q1 = _random_unit(self.rng), _random_unit(self.rng)
+        self.assertLess(_angle(np.array(qk._onlerp(*q0, *q1, 0.0)), q0), 1e-6)
+        self.assertLess(_angle(np.array(qk._onlerp(*q0, *q1, 1.0)), q1), 1e-6)
+
+    @unittest.skipUnless(SCIPY_AVAILABLE, "需要 SciPy")
+    def test_onlerp_matches_scipy_slerp(self):
+        for _ in range(200):
+            q0, q1 = _random_unit(self.rng), _random_unit(self.rng)
+            t = self.rng.random()
+            if q0 @ q1 < 0.0:
+                q1 = -q1  # SciPy 的 Slerp 不做符号翻转，这里先统一到较短路径
+            expected = Slerp([0.0, 1.0], Rotation.from_quat(_to_scipy(np.stack([q0, q1]))))(t)
+            result = Rotation.from_quat(_to_scipy(np.array(qk._onlerp(*q0, *q1, t))))
+            self.assertLess((expected.inv() * result).magnitude(), ONLERP_TOL)
+
+    def test_antipodal_target_is_same_rotation(self):
+        q = _random_unit(self.rng)
+        for t in (0.0, 0.3, 1.0):
+            self.assertLess(_angle(np.array(qk._onlerp(*q, *(-q), t)), q), 1e-6)
+
+        # 平滑步骤把 -q 视为已收敛，不更新几何体
+        prev = q.copy()
+        changed, converged, _ = _step(prev, -q, 0.5)
+        self.assertEqual((changed, converged), (False, True))
+        np.testing.assert_array_equal(prev, q)
+
+    def test_near_antipodal_takes_short_path(self):
+        q0 = _random_unit(self.rng)
+        q1 = -(q0 + 0.05 * _random_unit(self.rng))
+        q1 /= np.linalg.norm(q1)
+        prev = q0.copy()
+        _step(prev, q1, 0.5)
+        self.assertLess(_angle(prev, _slerp(q0, q1, 0.5)), ONLERP_TOL)
+        self.assertLess(_angle(prev, q0), _angle(q0, q1))
+
+    def test_smooth_step_converges(self):
+        prev, target = _random_unit(self.rng), _random_unit(self.rng)
+        for frames in range(1, 500):
+            expected = _slerp(prev, target, 0.2)
+            changed, converged, verts = _step(prev, target, 0.2)
+            self.assertTrue(changed)
+            self.assertLess(_angle(prev, expected), ONLERP_TOL)
+            if converged:
+                break
+        else:
+            self.fail("平滑插值未收敛")
+        self.assertTrue(qk.q_same_rotation(prev, target, 1e-10))
+        # 收敛后再调用不再改变姿态
+        changed, converged, _ = _step(prev, target, 0.2)
+        self.assertEqual((changed, converged), (False, True))
+
+    def test_smooth_step_skips_render_below_eps(self):
+        prev = np.array([1.0, 0.0, 0.0, 0.0])
+        target = np.array([np.cos(0.5), np.sin(0.5), 0.0, 0.0])
+        verts = np.eye(3)
+        verts_out = np.full((3, 3), np.nan)
+        last = prev.copy()
+        # t 极小时新姿态与 last 的差异低于 eps：prev 仍前进，但几何体不更新
+        changed, converged = qk.smooth_rotate_step(prev, target, last, 1e-6, 1e-6,
+                                                   verts, verts_out, verts, verts_out)
+        self.assertEqual((changed, converged), (False, False))
+        self.assertTrue(np.isnan(verts_out).all())
+        self.assertGreater(prev[1], 0.0)
+        np.testing.assert_array_equal(last, [1.0, 0.0, 0.0, 0.0])
+
+
+class TestRotation(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(7)
+        self.vectors = self.rng.normal(size=(50, 3))
+
+    def test_rotate_vectors_matches_matrix(self):
+        matrix = np.empty((3, 3))
+        out = np.empty_like(self.vectors)
+        for _ in range(100):
+            q = _random_unit(self.rng) * self.rng.uniform(0.5, 2.0)  # 非单位四元数会被归一化
+            qk.rotate_vectors(q, self.vectors, out)
+            qk.q_to_matrix(q, matrix)
+            np.testing.assert_allclose(out, self.vectors @ matrix.T, atol=1e-12)
+            np.testing.assert_allclose(matrix @ matrix.T, np.eye(3), atol=1e-12)
+
+    def test_smooth_step_rotates_geometry(self):
+        prev, target = _random_unit(self.rng), _random_unit(self.rng)
+        changed, _, verts = _step(prev, target, 0.4, verts=self.vectors)
+        self.assertTrue(changed)
+        expected = np.empty_like(self.vectors)
+        qk.rotate_vectors(prev, self.vectors, expected)
+        np.testing.assert_allclose(verts, expected, atol=1e-12)
+
+    def test_qmul_composes_rotations(self):
+        a, b = _random_unit(self.rng), _random_unit(self.rng)
+        ab = qk.qmul(a, b, np.empty(4))
+        ma, mb, mab = np.empty((3, 3)), np.empty((3, 3)), np.empty((3, 3))
+        qk.q_to_matrix(a, ma)
+        qk.q_to_matrix(b, mb)
+        qk.q_to_matrix(ab, mab)
+        np.testing.assert_allclose(mab, ma @ mb, atol=1e-12)
+
+        # q * q^-1 为单位四元数
+        identity = qk.qmul(a, qk.qconj(a, np.empty(4)), np.empty(4))
+        np.testing.assert_allclose(identity, [1.0, 0.0, 0.0, 0.0], atol=1e-12)
+
+    def test_qnormalize(self):
+        q = np.array([2.0, 0.0, 0.0, 0.0])
+        np.testing.assert_array_equal(qk.qnormalize(q, np.empty(4)), [1.0, 0.0, 0.0, 0.0])
+        np.testing.assert_array_equal(qk.qnormalize(np.zeros(4), np.empty(4)), np.zeros(4))
+
+    @unittest.skipUnless(SCIPY_AVAILABLE, "需要 SciPy")
+    def test_matches_scipy_rotation(self):
+        q = _random_unit(self.rng, 20)
+        rotations = Rotation.from_quat(_to_scipy(q))
+        matrix = np.empty((3, 3))
+        out = np.empty_like(self.vectors)
+        for i in range(len(q)):
+            qk.q_to_matrix(q[i], matrix)
+            np.testing.assert_allclose(matrix, rotations[i].as_matrix(), atol=1e-12)
+            qk.rotate_vectors(q[i], self.vectors, out)
+            np.testing.assert_allclose(out, rotations[i].apply(self.vectors), atol=1e-12)
+            product = qk.qmul(q[i], q[0], np.empty(4))
+            np.testing.assert_allclose(Rotation.from_quat(_to_scipy(product)).as_matrix(),
+                                       (rotations[i] * rotations[0]).as_matrix(), atol=1e-12)
+
+    def test_q_same_rotation(self):
+        q = _random_unit(self.rng)
+        self.assertTrue(qk.q_same_rotation(q, q, 1e-10))
+        self.assertTrue(qk.q_same_rotation(q, -q, 1e-10))
+        # 绕 x 轴转 1e-3 弧度：1 - cos(5e-4) ≈ 1.25e-7
+        small = np.array([np.cos(5e-4), np.sin(5e-4), 0.0, 0.0])
+        rotated = qk.qmul(q, small, np.empty(4))
+        self.assertFalse(qk.q_same_rotation(q, rotated, 1e-10))
+        self.assertTrue(qk.q_same_rotation(q, rotated, 1e-6))
+
+
+@unittest.skipUnless(qk.NUMBA_AVAILABLE and not os.environ.get('NUMBA_DISABLE_JIT'),
+                     "仅在 Numba 可用时对照纯 Python 路径")
+class TestWithoutJit(unittest.TestCase):
+
+    def test_pure_python_path(self):
+        env = dict(os.environ, NUMBA_DISABLE_JIT='1')
+        cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run(
+            [sys.executable, '-m', 'unittest', '-q',
+             'tests.test_quat_kernels.TestInterpolation', 'tests.test_quat_kernels.TestRotation'],
+            cwd=cwd, env=env, capture_output=True, text=True, timeout=300
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
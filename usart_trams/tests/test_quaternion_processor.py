@@ -0,0 +1,140 @@
+"""
+QuaternionProcessor 解析测试：向量化解析与逐行/逐块解析的结果一致
+"""
+
+import struct
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from src.quaternion_processor import QuaternionProcessor
+
+
+def _make_processor(data_format: str) -> QuaternionProcessor:
+    config = SimpleNamespace(processing=SimpleNamespace(enable_filtering=False))
+    processor = QuaternionProcessor(config)
+    processor.set_data_format(data_format)
+    return processor
+
+
+def _as_array(quaternions) -> np.ndarray:
+    return np.array([(q.w, q.x, q.y, q.z) for q in quaternions], dtype=np.float64).reshape(-1, 4)
+
+
+def _random_quaternions(n: int, seed: int = 0) -> np.ndarray:
+    q = np.random.default_rng(seed).normal(size=(n, 4))
+    return q / np.linalg.norm(q, axis=1, keepdims=True)
+
+
+def _chunks(data: bytes, sizes):
+    """按给定长度循环切分字节流，模拟串口每次读到的不完整数据"""
+    pos, i = 0, 0
+    while pos < len(data):
+        size = sizes[i % len(sizes)]
+        yield data[pos:pos + size]
+        pos += size
+        i += 1
+
+
+ASCII_STREAM = (
+    b"1.0,0.0,0.0,0.0\n"
+    b"0.7071,0.7071,0,0\r\n"
+    b"  0.5, 0.5, 0.5, 0.5 \n"
+    b"\n"
+    b"garbage line\n"
+    b"0.1,0.2,0.3\n"                 # 少于4个值
+    b"0.5,0.5,abc,0.5\n"             # 非法数值
+    b"0.6,0.8,0,0,17.5\n"            # 多余字段只取前4个
+    b"1e0,-0.0,+0.0,0.0\r"
+    b"nan,0,0,0\n"
+    b"0,0,0.6,0.8\n"
+    b"0,1,0,0"                       # 最后一行不完整，留在缓冲区
+)
+
+
+class TestAsciiParsing(unittest.TestCase):
+
+    def assert_same_as_scalar(self, stream: bytes, sizes):
+        vectorized = _make_processor('ascii')
+        scalar = _make_processor('ascii')
+        for chunk in _chunks(stream, sizes):
+            expected = _as_array(scalar._parse_ascii_quaternion(chunk))
+            np.testing.assert_array_equal(vectorized._parse_ascii_array(chunk), expected)
+            self.assertEqual(vectorized.ascii_buffer, scalar.ascii_buffer)
+
+    def test_mixed_lines_single_chunk(self):
+        # 格式错误的行会记录警告
+        with self.assertLogs('src.quaternion_processor', level='WARNING'):
+            self.assert_same_as_scalar(ASCII_STREAM, [len(ASCII_STREAM)])
+
+    def test_mixed_lines_partial_chunks(self):
+        for sizes in ([1], [3, 7], [5, 16, 2], [40]):
+            with self.subTest(sizes=sizes), self.assertLogs('src.quaternion_processor', level='WARNING'):
+                self.assert_same_as_scalar(ASCII_STREAM, sizes)
+
+    def test_clean_stream_uses_fast_path(self):
+        q = _random_quaternions(200)
+        stream = ''.join('%.6f,%.6f,%.6f,%.6f\n' % tuple(row) for row in q).encode('ascii')
+        self.assert_same_as_scalar(stream, [97, 13, 256])
+
+    def test_no_newline_keeps_buffer(self):
+        processor = _make_processor('ascii')
+        self.assertEqual(processor._parse_ascii_array(b"1.0,0,0").shape, (0, 4))
+        np.testing.assert_array_equal(processor._parse_ascii_array(b",0\n"), [[1.0, 0, 0, 0]])
+
+    def test_latest_matches_last_batch_result(self):
+        batch = _make_processor('ascii')
+        latest = _make_processor('ascii')
+        with self.assertLogs('src.quaternion_processor', level='WARNING'):
+            for chunk in _chunks(ASCII_STREAM * 3, [11, 29, 4, 64]):
+                expected, _ = batch.process_raw_data_batch(chunk)
+                result = latest.process_raw_data_latest(chunk)
+                if len(expected) == 0:
+                    self.assertIsNone(result)
+                else:
+                    np.testing.assert_allclose(result, expected[-1], rtol=0, atol=1e-12)
+                self.assertEqual(latest.ascii_buffer, batch.ascii_buffer)
+
+
+class TestBinaryParsing(unittest.TestCase):
+
+    def test_float32_matches_scalar(self):
+        processor = _make_processor('float32')
+        data = _random_quaternions(50).astype('<f4').tobytes() + b'\x01\x02\x03'  # 末尾不完整的块被忽略
+        np.testing.assert_array_equal(processor._parse_binary_array(data),
+                                      _as_array(processor._parse_float32_quaternion(data)))
+
+    def test_float64_matches_scalar(self):
+        processor = _make_processor('float64')
+        data = _random_quaternions(50).astype('<f8').tobytes() + b'\x00' * 31
+        np.testing.assert_array_equal(processor._parse_binary_array(data),
+                                      _as_array(processor._parse_float64_quaternion(data)))
+
+    def test_binary_mixed_byte_orders_match_scalar(self):
+        processor = _make_processor('binary')
+        q = _random_quaternions(60, seed=1).astype(np.float32)
+        blocks = []
+        for i, row in enumerate(q):
+            if i % 3 == 0:
+                blocks.append(struct.pack('<4f', *row))
+            elif i % 3 == 1:
+                blocks.append(struct.pack('>4f', *row))
+            else:
+                blocks.append(struct.pack('<4f', *(row * 100)))  # 模长超出范围，两种字节序都不接受
+        data = b''.join(blocks) + b'\xff' * 9
+
+        expected = _as_array(processor._parse_binary_quaternion(data))
+        result = processor._parse_binary_array(data)
+        np.testing.assert_array_equal(result, expected)
+        self.assertEqual(len(result), 40)
+        np.testing.assert_allclose(result, q[np.arange(60) % 3 != 2], rtol=1e-6)
+
+    def test_empty_input(self):
+        for data_format in ('float32', 'float64', 'binary'):
+            processor = _make_processor(data_format)
+            self.assertEqual(processor._parse_binary_array(b'\x00' * 5).shape, (0, 4))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+RingBuffer 单元测试：回绕写入与按写入顺序展开
+"""
+
+import unittest
+
+import numpy as np
+
+from src.ring_buffer import RingBuffer
+
+
+def _rows(start, stop, columns=2):
+    """生成第 start..stop-1 行，每行的值都等于行号，便于检查顺序"""
+    return np.repeat(np.arange(start, stop, dtype=np.float64)[:, None], columns, axis=1)
+
+
+class TestRingBuffer(unittest.TestCase):
+
+    def test_empty(self):
+        buf = RingBuffer(4, 2)
+        self.assertEqual(len(buf), 0)
+        self.assertEqual(buf.view().shape, (0, 2))
+
+    def test_extend_within_capacity_is_zero_copy(self):
+        buf = RingBuffer(8, 2)
+        buf.extend(_rows(0, 5))
+        view = buf.view()
+        np.testing.assert_array_equal(view, _rows(0, 5))
+        self.assertTrue(np.shares_memory(view, buf._buf))
+
+    def test_extend_straddling_seam(self):
+        buf = RingBuffer(5, 2)
+        buf.extend(_rows(0, 3))
+        buf.extend(_rows(3, 7))  # 跨越回绕点，分两段写入
+        self.assertEqual(len(buf), 5)
+        np.testing.assert_array_equal(buf.view(), _rows(2, 7))
+
+    def test_extend_larger_than_capacity_keeps_newest(self):
+        buf = RingBuffer(4, 2)
+        buf.extend(_rows(0, 1))
+        buf.extend(_rows(1, 11))
+        self.assertEqual(len(buf), 4)
+        np.testing.assert_array_equal(buf.view(), _rows(7, 11))
+
+    def test_head_zero_after_wrap(self):
+        buf = RingBuffer(4, 2)
+        buf.extend(_rows(0, 3))
+        buf.extend(_rows(3, 6))
+        buf.extend(_rows(6, 8))  # 回绕后 head 恰好回到 0
+        self.assertEqual(buf._head, 0)
+        view = buf.view()
+        np.testing.assert_array_equal(view, _rows(4, 8))
+        self.assertTrue(np.shares_memory(view, buf._buf))
+
+    def test_append_wraps(self):
+        buf = RingBuffer(3, 2)
+        for i in range(7):
+            buf.append(_rows(i, i + 1)[0])
+        np.testing.assert_array_equal(buf.view(), _rows(4, 7))
+
+    def test_clear(self):
+        buf = RingBuffer(3, 2)
+        buf.extend(_rows(0, 5))
+        buf.clear()
+        self.assertEqual(len(buf), 0)
+        buf.extend(_rows(10, 12))
+        np.testing.assert_array_equal(buf.view(), _rows(10, 12))
+
+    def test_structured_rows(self):
+        dtype = np.dtype([('t', np.float32), ('q', np.int16, 4)])
+        buf = RingBuffer(3, dtype=dtype)
+        rows = np.zeros(4, dtype=dtype)
+        rows['t'] = np.arange(4)
+        buf.extend(rows)
+        np.testing.assert_array_equal(buf.view()['t'], [1, 2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
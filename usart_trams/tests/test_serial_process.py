@@ -0,0 +1,94 @@
+"""
+跨进程测试：SharedRingBuffer 子进程写入 / 父进程读取，以及 SerialProcess 的清空请求
+"""
+
+import multiprocessing as mp
+import time
+import unittest
+
+import numpy as np
+
+from src.config import Config
+from src.ring_buffer import SharedRingBuffer
+from src.serial_process import HISTORY_DTYPE, SerialProcess
+
+
+def _writer(spec, total, batch):
+    """子进程：按批写入行号递增的数据"""
+    history = SharedRingBuffer.attach(spec)
+    try:
+        for start in range(0, total, batch):
+            stop = min(start + batch, total)
+            history.extend(np.arange(start, stop, dtype=np.float64))
+    finally:
+        history.close()
+
+
+class TestSharedRingBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.history = SharedRingBuffer(64, dtype=np.float64)
+
+    def tearDown(self):
+        self.history.close()
+        self.history.unlink()
+
+    def test_attach_sees_same_state(self):
+        other = SharedRingBuffer.attach(self.history.spec)
+        try:
+            self.history.extend(np.arange(100, dtype=np.float64))
+            self.assertEqual(len(other), 64)
+            np.testing.assert_array_equal(other.view(), np.arange(36, 100))
+            other.clear()
+            self.assertEqual(len(self.history), 0)
+        finally:
+            other.close()
+
+    def test_child_writes_parent_reads_consistent_snapshots(self):
+        total = 200_000
+        ctx = mp.get_context('spawn')
+        writer = ctx.Process(target=_writer, args=(self.history.spec, total, 7))
+        writer.start()
+        try:
+            while writer.is_alive():
+                snapshot = self.history.view().copy()
+                if len(snapshot) > 1:
+                    # 快照必须是连续递增的一段，不能混入被覆盖的新数据
+                    np.testing.assert_array_equal(np.diff(snapshot), 1.0)
+        finally:
+            writer.join(30)
+        self.assertEqual(writer.exitcode, 0)
+        np.testing.assert_array_equal(self.history.view(), np.arange(total - 64, total))
+
+
+class TestSerialProcess(unittest.TestCase):
+
+    def test_request_clear_crosses_process_boundary(self):
+        config = Config()
+        config.serial.port = '/dev/nonexistent'
+        history = SharedRingBuffer(16, dtype=HISTORY_DTYPE)
+        start_time = mp.RawValue('d', 0.0)
+        data_count = mp.RawValue('q', 0)
+        try:
+            rows = np.zeros(5, dtype=HISTORY_DTYPE)
+            rows['t'] = np.arange(5)
+            history.extend(rows)
+            data_count.value = 5
+
+            process = SerialProcess(config, history, start_time, data_count)
+            process.request_clear()
+            before = time.time()
+            process.start()
+            process.stop(timeout=10.0)
+
+            # 串口打开失败后子进程退出，退出前执行挂起的清空请求
+            self.assertEqual(len(history), 0)
+            self.assertEqual(data_count.value, 0)
+            self.assertGreaterEqual(start_time.value, before)
+        finally:
+            history.close()
+            history.unlink()
+
+
+if __name__ == '__main__':
+    unittest.main()